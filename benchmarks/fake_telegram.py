@@ -0,0 +1,128 @@
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from telegram.request import (
+    BaseRequest,
+    RequestData,
+)
+
+from database import engine
+from models import (
+    Group,
+    Player,
+)
+
+BOT_ID = 1
+
+BOT_USER = {"id": BOT_ID, "is_bot": True, "first_name": "Court Jester Selector", "username": "court_jester_selector_bot"}
+
+ADMINISTRATOR_RIGHTS = {
+    "can_be_edited": False,
+    "is_anonymous": False,
+    "can_manage_chat": True,
+    "can_delete_messages": True,
+    "can_manage_video_chats": True,
+    "can_restrict_members": True,
+    "can_promote_members": False,
+    "can_change_info": True,
+    "can_invite_users": True,
+    "can_post_stories": False,
+    "can_edit_stories": False,
+    "can_delete_stories": False,
+}
+
+def user_json(user_id: int, first_name: str, last_name: Optional[str] = None, username: Optional[str] = None) -> Dict[str, Any]:
+    user = {"id": user_id, "is_bot": False, "first_name": first_name}
+    if last_name:
+        user["last_name"] = last_name
+    if username:
+        user["username"] = username
+    return user
+
+def chat_member_json(status: str, user: Dict[str, Any]) -> Dict[str, Any]:
+    if status == "administrator":
+        return {"status": status, "user": user, **ADMINISTRATOR_RIGHTS}
+    if status == "creator":
+        return {"status": status, "user": user, "is_anonymous": False}
+    return {"status": status, "user": user}
+
+class FakeTelegram(BaseRequest):
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._members: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._administrators: Dict[int, list] = {}
+        self._message_ids = itertools.count(1)
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def load(self) -> None:
+        async with AsyncSession(engine) as session:
+            result = await session.exec(
+                select(Group.telegram_id, Player)
+                .join(Player, Player.group_id == Group.id)
+            )
+            for chat_id, player in result.all():
+                chat_member = chat_member_json(
+                    player.status,
+                    user_json(player.telegram_id, player.telegram_first_name, player.telegram_last_name, player.telegram_username)
+                )
+                self._members[(chat_id, player.telegram_id)] = chat_member
+                if player.status in ("administrator", "creator"):
+                    self._administrators.setdefault(chat_id, []).append(chat_member)
+
+    def set_status(self, chat_id: int, user_id: int, status: str) -> None:
+        chat_member = self._members.get((chat_id, user_id)) or chat_member_json("member", user_json(user_id, f"User {user_id}"))
+        self._members[(chat_id, user_id)] = chat_member_json(status, chat_member["user"])
+        administrators = [administrator for administrator in self._administrators.get(chat_id, []) if administrator["user"]["id"] != user_id]
+        if status in ("administrator", "creator"):
+            administrators.append(self._members[(chat_id, user_id)])
+        self._administrators[chat_id] = administrators
+
+    def _message(self, chat_id: int, text: str) -> Dict[str, Any]:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": int(chat_id), "type": "supergroup" if int(chat_id) < 0 else "private"},
+            "from": BOT_USER,
+            "text": text,
+        }
+
+    def _answer(self, endpoint: str, parameters: Dict[str, Any]) -> Any:
+        if endpoint == "getMe":
+            return BOT_USER
+        if endpoint == "getChatMember":
+            chat_id, user_id = int(parameters["chat_id"]), int(parameters["user_id"])
+            return self._members.get((chat_id, user_id)) or chat_member_json("member", user_json(user_id, f"User {user_id}"))
+        if endpoint == "getChatAdministrators":
+            return self._administrators.get(int(parameters["chat_id"]), [])
+        if endpoint in ("sendMessage", "editMessageText"):
+            return self._message(parameters.get("chat_id", BOT_ID), parameters.get("text", ""))
+        return True
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None, *args, **kwargs) -> Tuple[int, bytes]:
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        result = self._answer(endpoint, request_data.parameters if request_data else {})
+        return 200, json.dumps({"ok": True, "result": result}).encode()
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+)
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from telegram import Update
+from telegram.ext import (
+    Application,
+    ContextTypes,
+)
+
+import main
+from benchmarks.fake_telegram import (
+    BOT_USER,
+    FakeTelegram,
+    chat_member_json,
+    user_json,
+)
+from benchmarks.seed import (
+    PLAYER_TELEGRAM_ID_BASE,
+    seed,
+)
+from benchmarks.update_processing import percentile
+from config import (
+    MAX_WEIGHT,
+    MIN_WEIGHT,
+    PICK_PLAYER_COMMAND,
+    SHOW_LEADERBOARD_COMMAND,
+    SHOW_PERSONAL_STATS_COMMAND,
+    TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS,
+    TG_BOT_TOKEN,
+    UPDATE_PLAYER_WEIGHT_COMMAND,
+)
+from database import (
+    dispose,
+    engine,
+)
+from metrics import (
+    StatementStats,
+    current_statement_stats,
+    sql_statements,
+)
+from models import (
+    Group,
+    Player,
+)
+from services import CoalescingBot
+
+SCENARIOS = (
+    "chat_member_handler",
+    "pick_player",
+    "show_leaderboard",
+    "show_personal_stats",
+    "approve_group",
+    "weight_flow",
+)
+
+class World:
+    def __init__(self) -> None:
+        self.groups: List[int] = []
+        self.group_telegram_ids: Dict[int, int] = {}
+        self.players: Dict[int, List[Player]] = {}
+        self.pending_group_ids: List[int] = []
+        self.admin_group_ids: Dict[int, List[int]] = {}
+        self._update_ids = itertools.count(1)
+
+    async def load(self) -> None:
+        async with AsyncSession(engine) as session:
+            result = await session.exec(select(Group))
+            for group in result.all():
+                self.group_telegram_ids[group.id] = group.telegram_id
+                if group.approved:
+                    self.groups.append(group.id)
+                else:
+                    self.pending_group_ids.append(group.id)
+            result = await session.exec(select(Player).order_by(Player.group_id, Player.telegram_id))
+            for player in result.all():
+                if player.group_id in self.group_telegram_ids:
+                    self.players.setdefault(player.group_id, []).append(player)
+                    if player.status == "administrator":
+                        self.admin_group_ids.setdefault(player.telegram_id, []).append(player.group_id)
+
+    def next_update_id(self) -> int:
+        return next(self._update_ids)
+
+    @property
+    def admin_ids(self) -> List[int]:
+        return sorted(self.admin_group_ids)
+
+    def user(self, telegram_id: int) -> Dict[str, Any]:
+        number = telegram_id - PLAYER_TELEGRAM_ID_BASE
+        return user_json(telegram_id, "Player", str(number), f"player_{number}")
+
+    def message(self, chat_id: int, telegram_id: int, text: str) -> Dict[str, Any]:
+        update_id = next(self._update_ids)
+        message = {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"},
+            "from": self.user(telegram_id),
+            "text": text,
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+        return {"update_id": update_id, "message": message}
+
+    def callback_query(self, telegram_id: int, data: str) -> Dict[str, Any]:
+        update_id = next(self._update_ids)
+        return {
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": self.user(telegram_id),
+                "chat_instance": str(telegram_id),
+                "data": data,
+                "message": {
+                    "message_id": update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": telegram_id, "type": "private"},
+                    "text": "",
+                },
+            },
+        }
+
+    def my_chat_member(self, chat_id: int, title: str, telegram_id: int, status: str) -> Dict[str, Any]:
+        update_id = next(self._update_ids)
+        return {
+            "update_id": update_id,
+            "my_chat_member": {
+                "chat": {"id": chat_id, "type": "supergroup", "title": title},
+                "from": self.user(telegram_id),
+                "date": int(time.time()),
+                "old_chat_member": chat_member_json("left", BOT_USER),
+                "new_chat_member": chat_member_json(status, BOT_USER),
+            },
+        }
+
+    def group_message(self, rng: random.Random, text: str) -> List[Dict[str, Any]]:
+        group_id = rng.choice(self.groups)
+        player = rng.choice(self.players[group_id])
+        return [self.message(self.group_telegram_ids[group_id], player.telegram_id, text)]
+
+    def weight_flow(self, rng: random.Random, admin_id: int) -> List[Dict[str, Any]]:
+        group_id = rng.choice(self.admin_group_ids[admin_id])
+        player = rng.choice(self.players[group_id])
+        return [
+            self.message(admin_id, admin_id, f"/{UPDATE_PLAYER_WEIGHT_COMMAND}"),
+            self.callback_query(admin_id, f"show_players_in_group:{group_id}"),
+            self.callback_query(admin_id, f"select_player:{player.id}"),
+            self.callback_query(admin_id, f"weight:{rng.randint(MIN_WEIGHT, MAX_WEIGHT)}"),
+        ]
+
+def scenario_builder(world: World, name: str, approver_id: int) -> Callable[[random.Random, int, int], List[Dict[str, Any]]]:
+    if name == "chat_member_handler":
+        return lambda rng, worker, iteration: world.group_message(rng, "Good morning, court!")
+    if name == "pick_player":
+        return lambda rng, worker, iteration: world.group_message(rng, f"/{PICK_PLAYER_COMMAND}")
+    if name == "show_leaderboard":
+        return lambda rng, worker, iteration: world.group_message(rng, f"/{SHOW_LEADERBOARD_COMMAND}")
+    if name == "show_personal_stats":
+        return lambda rng, worker, iteration: world.group_message(rng, f"/{SHOW_PERSONAL_STATS_COMMAND}")
+    if name == "approve_group":
+        return lambda rng, worker, iteration: [world.callback_query(approver_id, f"approve:{world.pending_group_ids[iteration]}")]
+    return lambda rng, worker, iteration: world.weight_flow(rng, world.admin_ids[worker % len(world.admin_ids)])
+
+async def run_scenario(application: Application, fake_telegram: FakeTelegram, build: Callable, iterations: int, concurrency: int, seed_: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statements: List[int] = []
+    errors = []
+    api_calls_before = fake_telegram.calls.copy()
+    sql_statements_before = sql_statements.get()
+    pending_iterations = iter(range(iterations))
+
+    async def on_error(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+        errors.append(repr(context.error))
+
+    async def worker(index: int) -> None:
+        rng = random.Random(seed_ * 1000 + index)
+        for iteration in pending_iterations:
+            for data in build(rng, index, iteration):
+                update = Update.de_json(data, application.bot)
+                stats = StatementStats()
+                token = current_statement_stats.set(stats)
+                started_at = time.perf_counter()
+                try:
+                    await application.process_update(update)
+                finally:
+                    latencies.append(time.perf_counter() - started_at)
+                    current_statement_stats.reset(token)
+                statements.append(stats.statements)
+
+    application.add_error_handler(on_error)
+    started_at = time.perf_counter()
+    try:
+        await asyncio.gather(*[worker(index) for index in range(concurrency)])
+    finally:
+        application.remove_error_handler(on_error)
+    elapsed = time.perf_counter() - started_at
+    await main.player_write_buffer.flush()
+
+    api_calls = dict(sorted((fake_telegram.calls - api_calls_before).items()))
+    update_statements = sum(statements)
+    return {
+        "updates": len(latencies),
+        "concurrency": concurrency,
+        "elapsed": round(elapsed, 4),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0,
+        "p50": round(statistics.median(latencies), 5) if latencies else None,
+        "p95": round(percentile(latencies, 0.95), 5) if latencies else None,
+        "p99": round(percentile(latencies, 0.99), 5) if latencies else None,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "sql_statements": update_statements,
+        "sql_statements_per_update": round(update_statements / len(statements), 3) if statements else 0,
+        "max_sql_statements_per_update": max(statements, default=0),
+        "deferred_sql_statements": int(sql_statements.get() - sql_statements_before - update_statements),
+        "api_calls": api_calls,
+        "api_calls_per_update": round(sum(api_calls.values()) / len(latencies), 3) if latencies else 0,
+    }
+
+async def build_application(latency: float) -> Application:
+    fake_telegram = FakeTelegram(latency)
+    await fake_telegram.load()
+    bot = CoalescingBot(
+        token=TG_BOT_TOKEN,
+        request=fake_telegram,
+        get_updates_request=FakeTelegram(0),
+        rate_limiter=main.rate_limiter,
+        coalescer=main.request_coalescer
+    )
+    application = Application.builder().bot(bot).context_types(main.context_types).updater(None).build()
+    main.set_handlers(application)
+    return application
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    approver_id = TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS[0] if TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS else PLAYER_TELEGRAM_ID_BASE + 1
+    if args.reset:
+        await seed(args.groups, args.players, args.days, args.admins, args.iterations, approver_id)
+
+    world = World()
+    await world.load()
+    if not world.groups:
+        raise SystemExit("The database holds no approved group: run with --reset against a disposable database.")
+
+    application = await build_application(args.latency)
+    fake_telegram = application.bot.request
+    results = {}
+    async with application:
+        main.player_write_buffer.start()
+        await main.group_registry.load()
+        await main.admin_command_registry.load()
+        try:
+            for name in args.scenarios:
+                iterations = args.iterations
+                concurrency = args.concurrency
+                if name == "approve_group":
+                    iterations = min(iterations, len(world.pending_group_ids))
+                elif name == "weight_flow":
+                    concurrency = min(concurrency, len(world.admin_ids))
+                if not iterations or not concurrency:
+                    continue
+                results[name] = await run_scenario(application, fake_telegram, scenario_builder(world, name, approver_id), iterations, concurrency, args.seed)
+        finally:
+            await main.player_write_buffer.stop()
+    await dispose()
+
+    return {
+        "parameters": {
+            "groups": len(world.groups),
+            "players_per_group": max((len(players) for players in world.players.values()), default=0),
+            "days": args.days if args.reset else None,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "seed": args.seed,
+        },
+        "passed": not any(scenario["errors"] for scenario in results.values()),
+        "scenarios": results,
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Drive the real handlers against a fake Bot API and a local PostgreSQL database.")
+    parser.add_argument("--reset", action="store_true", help="Truncate every table of DB_URI and seed it (the schema must be migrated).")
+    parser.add_argument("--groups", type=int, default=100, help="Number of approved groups to seed.")
+    parser.add_argument("--players", type=int, default=50, help="Number of players to seed per group.")
+    parser.add_argument("--days", type=int, default=365, help="Number of past days of draws to seed per group.")
+    parser.add_argument("--admins", type=int, default=3, help="Number of administrators among the players of each group.")
+    parser.add_argument("--iterations", type=int, default=200, help="Number of iterations per scenario (the weight flow sends four updates per iteration).")
+    parser.add_argument("--concurrency", type=int, default=10, help="Number of iterations run at the same time.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds taken by each fake Bot API call.")
+    parser.add_argument("--scenario", dest="scenarios", action="append", choices=SCENARIOS, help="Scenario to run (repeatable, all by default).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random update generator.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of the standard output.")
+    args = parser.parse_args()
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = asyncio.run(run(args))
+    report = json.dumps(result, indent=4)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    else:
+        sys.stdout.write(report + "\n")
+    sys.exit(0 if result["passed"] else 1)
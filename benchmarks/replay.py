@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from telegram import Update
+from telegram.ext import (
+    Application,
+    ContextTypes,
+    TypeHandler,
+)
+
+import main
+from benchmarks.fake_telegram import FakeTelegram
+from benchmarks.handlers import World
+from benchmarks.seed import (
+    JOINED_GROUP_TELEGRAM_ID_BASE,
+    seed,
+)
+from benchmarks.update_processing import percentile
+from config import (
+    PICK_PLAYER_COMMAND,
+    SHOW_LEADERBOARD_COMMAND,
+    TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS,
+)
+from database import dispose
+from services import KeyedUpdateProcessor
+
+# Runs after the handlers of group 0 so that it sees every update once it has been handled.
+RECORDER_GROUP = 1
+
+MIX = {
+    "chatter": 0.9,
+    "show_leaderboard": 0.05,
+    "pick_player": 0.03,
+    "my_chat_member": 0.02,
+}
+
+class UpdateStream:
+    def __init__(self, world: World, rng: random.Random, recorded: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.world = world
+        self.rng = rng
+        self._recorded: Optional[Iterator[Dict[str, Any]]] = itertools.cycle(recorded) if recorded else None
+        self._joins = itertools.count(1)
+
+    def background(self) -> Tuple[str, Dict[str, Any]]:
+        if self._recorded is not None:
+            data = dict(next(self._recorded))
+            data["update_id"] = self.world.next_update_id()
+            return "recorded", data
+        kind = self.rng.choices(list(MIX), list(MIX.values()))[0]
+        if kind == "chatter":
+            return kind, self.world.group_message(self.rng, "Good morning, court!")[0]
+        if kind == "show_leaderboard":
+            return kind, self.world.group_message(self.rng, f"/{SHOW_LEADERBOARD_COMMAND}")[0]
+        if kind == "pick_player":
+            return kind, self.world.group_message(self.rng, f"/{PICK_PLAYER_COMMAND}")[0]
+        number = next(self._joins)
+        return kind, self.world.my_chat_member(
+            JOINED_GROUP_TELEGRAM_ID_BASE - number,
+            f"Joined group {number}",
+            self.rng.choice(self.world.admin_ids),
+            "administrator"
+        )
+
+    def burst(self, group_id: int, senders: int) -> List[Tuple[str, Dict[str, Any]]]:
+        players = self.rng.sample(self.world.players[group_id], min(senders, len(self.world.players[group_id])))
+        return [
+            ("crown_burst", self.world.message(self.world.group_telegram_ids[group_id], player.telegram_id, f"/{PICK_PLAYER_COMMAND}"))
+            for player in players
+        ]
+
+class Recorder:
+    def __init__(self) -> None:
+        self.in_flight: Dict[int, Tuple[str, float]] = {}
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.first_error: Optional[str] = None
+        self.last_completed_at = 0.0
+
+    def reset(self) -> None:
+        self.latencies = {}
+        self.errors = {}
+        self.first_error = None
+
+    def sent(self, update_id: int, kind: str) -> None:
+        self.in_flight[update_id] = (kind, time.perf_counter())
+
+    async def handled(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        entry = self.in_flight.pop(update.update_id, None)
+        if entry is None:
+            return
+        kind, sent_at = entry
+        self.last_completed_at = time.perf_counter()
+        self.latencies.setdefault(kind, []).append(self.last_completed_at - sent_at)
+
+    async def failed(self, update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if not isinstance(update, Update) or update.update_id not in self.in_flight:
+            return
+        kind, _ = self.in_flight[update.update_id]
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+        if self.first_error is None:
+            self.first_error = repr(context.error)
+
+def schedule(stream: UpdateStream, rate: float, duration: float, burst_groups: int, burst_senders: int, burst_window: float) -> List[Tuple[float, str, Dict[str, Any]]]:
+    events = []
+    offset = stream.rng.expovariate(rate)
+    while offset < duration:
+        events.append((offset, *stream.background()))
+        offset += stream.rng.expovariate(rate)
+    for group_id in stream.rng.sample(stream.world.groups, min(burst_groups, len(stream.world.groups))):
+        for kind, data in stream.burst(group_id, burst_senders):
+            events.append((stream.rng.uniform(0, burst_window), kind, data))
+    events.sort(key=lambda event: event[0])
+    return events
+
+async def run_step(application: Application, recorder: Recorder, fake_telegram: FakeTelegram, events: List[Tuple[float, str, Dict[str, Any]]], rate: float, drain_timeout: float) -> Dict[str, Any]:
+    recorder.reset()
+    api_calls_before = fake_telegram.calls.copy()
+    max_backlog = 0
+    started_at = time.perf_counter()
+    for offset, kind, data in events:
+        delay = started_at + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        update = Update.de_json(data, application.bot)
+        recorder.sent(update.update_id, kind)
+        await application.update_queue.put(update)
+        max_backlog = max(max_backlog, len(recorder.in_flight))
+    sent_at = time.perf_counter()
+    deadline = sent_at + drain_timeout
+    while recorder.in_flight and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+
+    latencies = [latency for kind_latencies in recorder.latencies.values() for latency in kind_latencies]
+    errors = sum(recorder.errors.values())
+    elapsed = max(recorder.last_completed_at, sent_at) - started_at
+    api_calls = sum((fake_telegram.calls - api_calls_before).values())
+    return {
+        "rate": round(rate, 2),
+        "sent": len(events),
+        "completed": len(latencies),
+        "unfinished": len(recorder.in_flight),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0,
+        "max_backlog": max_backlog,
+        "p50": round(statistics.median(latencies), 5) if latencies else None,
+        "p95": round(percentile(latencies, 0.95), 5) if latencies else None,
+        "p99": round(percentile(latencies, 0.99), 5) if latencies else None,
+        "p99_by_kind": {kind: round(percentile(values, 0.99), 5) for kind, values in sorted(recorder.latencies.items())},
+        "errors": errors,
+        "error_rate": round(errors / len(events), 5) if events else 0,
+        "first_error": recorder.first_error,
+        "api_calls_per_update": round(api_calls / len(latencies), 3) if latencies else 0,
+    }
+
+def breached_slos(step: Dict[str, Any], slo_p99: float, slo_error_rate: float) -> List[str]:
+    breaches = []
+    if step["unfinished"]:
+        breaches.append("unfinished")
+    if step["p99"] is not None and step["p99"] > slo_p99:
+        breaches.append("p99")
+    if step["error_rate"] > slo_error_rate:
+        breaches.append("error_rate")
+    return breaches
+
+def load_recorded(path: str) -> List[Dict[str, Any]]:
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.reset:
+        approver_id = TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS[0] if TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS else 0
+        await seed(args.groups, args.players, args.days, args.admins, 0, approver_id)
+
+    world = World()
+    await world.load()
+    if not world.groups:
+        raise SystemExit("The database holds no approved group: run with --reset against a disposable database.")
+
+    fake_telegram = FakeTelegram(args.latency)
+    await fake_telegram.load()
+    builder = main.application_builder(fake_telegram, FakeTelegram(0)).updater(None)
+    if args.concurrent_updates:
+        builder = builder.concurrent_updates(KeyedUpdateProcessor(args.concurrent_updates))
+    application = builder.build()
+    recorder = Recorder()
+    stream = UpdateStream(world, random.Random(args.seed), load_recorded(args.updates) if args.updates else None)
+
+    steps = []
+    max_sustained_rate = None
+    saturation_rate = None
+    async with application:
+        main.set_handlers(application)
+        application.add_handler(TypeHandler(Update, recorder.handled), group=RECORDER_GROUP)
+        application.add_error_handler(recorder.failed)
+        main.player_write_buffer.start()
+        await main.group_registry.load()
+        await main.admin_command_registry.load()
+        await application.start()
+        try:
+            rate = args.start_rate
+            while rate <= args.max_rate:
+                events = schedule(stream, rate, args.step_duration, args.burst_groups, args.burst_senders, args.burst_window)
+                step = await run_step(application, recorder, fake_telegram, events, rate, args.drain_timeout)
+                step["breached"] = breached_slos(step, args.slo_p99, args.slo_error_rate)
+                steps.append(step)
+                print(json.dumps(step), file=sys.stderr)
+                if step["breached"]:
+                    saturation_rate = rate
+                    break
+                max_sustained_rate = rate
+                rate *= args.rate_factor
+        finally:
+            await application.stop()
+            await main.player_write_buffer.stop()
+    await dispose()
+
+    return {
+        "parameters": {
+            "groups": len(world.groups),
+            "updates": args.updates,
+            "step_duration": args.step_duration,
+            "burst_groups": args.burst_groups,
+            "burst_senders": args.burst_senders,
+            "burst_window": args.burst_window,
+            "latency": args.latency,
+            "concurrent_updates": application.update_processor.max_workers,
+            "slo_p99": args.slo_p99,
+            "slo_error_rate": args.slo_error_rate,
+            "seed": args.seed,
+        },
+        "max_sustained_rate": max_sustained_rate,
+        "saturation_rate": saturation_rate,
+        "steps": steps,
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay a stream of updates through the update queue at increasing rates until the latency SLOs break.")
+    parser.add_argument("--reset", action="store_true", help="Truncate every table of DB_URI and seed it (the schema must be migrated).")
+    parser.add_argument("--groups", type=int, default=1000, help="Number of approved groups to seed.")
+    parser.add_argument("--players", type=int, default=50, help="Number of players to seed per group.")
+    parser.add_argument("--days", type=int, default=365, help="Number of past days of draws to seed per group.")
+    parser.add_argument("--admins", type=int, default=3, help="Number of administrators among the players of each group.")
+    parser.add_argument("--updates", help="JSON lines file of recorded updates replayed in a loop instead of the synthetic mix.")
+    parser.add_argument("--start-rate", type=float, default=10, help="Background updates per second of the first step.")
+    parser.add_argument("--rate-factor", type=float, default=1.5, help="Factor applied to the rate after each step meeting the SLOs.")
+    parser.add_argument("--max-rate", type=float, default=5000, help="Rate at which the ramp stops even if the SLOs still hold.")
+    parser.add_argument("--step-duration", type=float, default=30, help="Seconds of updates sent per step.")
+    parser.add_argument("--burst-groups", type=int, default=200, help="Number of groups crowning their jester at the start of each step, as at 9am.")
+    parser.add_argument("--burst-senders", type=int, default=3, help="Number of members sending the crown command in each bursting group.")
+    parser.add_argument("--burst-window", type=float, default=5, help="Seconds over which the crown burst is spread.")
+    parser.add_argument("--drain-timeout", type=float, default=30, help="Seconds to wait for the updates of a step to be handled once sent.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds taken by each fake Bot API call.")
+    parser.add_argument("--concurrent-updates", type=int, help="Override CONCURRENT_UPDATES.")
+    parser.add_argument("--slo-p99", type=float, default=1.0, help="Maximum p99 update latency in seconds.")
+    parser.add_argument("--slo-error-rate", type=float, default=0.01, help="Maximum fraction of updates ending in an error.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random update generator.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of the standard output.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = json.dumps(asyncio.run(run(args)), indent=4)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    else:
+        sys.stdout.write(report + "\n")
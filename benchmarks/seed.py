@@ -0,0 +1,57 @@
+from datetime import date
+
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from config import DEFAULT_WEIGHT
+from database import engine
+
+GROUP_TELEGRAM_ID_BASE = -1000000000000
+PENDING_GROUP_TELEGRAM_ID_BASE = -2000000000000
+JOINED_GROUP_TELEGRAM_ID_BASE = -3000000000000
+PLAYER_TELEGRAM_ID_BASE = 1000
+
+async def seed(groups: int, players: int, days: int, admins: int, pending_groups: int, approver_id: int) -> None:
+    today = date.today()
+    async with AsyncSession(engine) as session:
+        await session.exec(text('TRUNCATE draw, player_draw_count, player, "group", admin_command, weight_flow RESTART IDENTITY CASCADE'))
+        await session.exec(
+            text(
+                'INSERT INTO "group" (status, telegram_id, telegram_title, approved) '
+                "SELECT 'administrator', CAST(:base AS bigint) - g, 'Group ' || g, true FROM generate_series(1, :groups) g"
+            ),
+            params={"base": GROUP_TELEGRAM_ID_BASE, "groups": groups}
+        )
+        await session.exec(
+            text(
+                'INSERT INTO "group" (status, telegram_id, telegram_title, approved, approval_messages) '
+                "SELECT 'administrator', CAST(:base AS bigint) - g, 'Pending group ' || g, false, json_build_object(CAST(:approver_id AS text), g) "
+                "FROM generate_series(1, :pending_groups) g"
+            ),
+            params={"base": PENDING_GROUP_TELEGRAM_ID_BASE, "pending_groups": pending_groups, "approver_id": str(approver_id)}
+        )
+        await session.exec(
+            text(
+                "INSERT INTO player (status, group_id, telegram_id, telegram_first_name, telegram_last_name, telegram_username, weight) "
+                "SELECT CASE WHEN p <= :admins THEN 'administrator' ELSE 'member' END, g.id, :base + p, 'Player', CAST(p AS text), 'player_' || p, :weight "
+                'FROM "group" g CROSS JOIN generate_series(1, :players) p'
+            ),
+            params={"admins": admins, "base": PLAYER_TELEGRAM_ID_BASE, "players": players, "weight": DEFAULT_WEIGHT}
+        )
+        await session.exec(
+            text(
+                "INSERT INTO draw (draw_date, group_id, player_id) "
+                "SELECT CAST(:today AS date) - x.d, x.group_id, p.id "
+                'FROM (SELECT g.id AS group_id, d, 1 + floor(random() * :players) AS n FROM "group" g CROSS JOIN generate_series(1, :days) d WHERE g.approved) x '
+                "JOIN player p ON p.group_id = x.group_id AND p.telegram_id = :base + x.n"
+            ),
+            params={"today": today, "players": players, "days": days, "base": PLAYER_TELEGRAM_ID_BASE}
+        )
+        await session.exec(
+            text(
+                "INSERT INTO player_draw_count (player_id, group_id, draw_count, last_drawn_on) "
+                "SELECT player_id, group_id, count(*), max(draw_date) FROM draw GROUP BY player_id, group_id"
+            )
+        )
+        await session.exec(text("ANALYZE"))
+        await session.commit()
@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import json
+import sys
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+)
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from telegram import Update
+from telegram.ext import (
+    Application,
+    ContextTypes,
+)
+
+import main
+from benchmarks.fake_telegram import FakeTelegram
+from benchmarks.handlers import (
+    World,
+    build_application,
+)
+from benchmarks.seed import (
+    JOINED_GROUP_TELEGRAM_ID_BASE,
+    PLAYER_TELEGRAM_ID_BASE,
+    seed,
+)
+from config import (
+    DEFAULT_WEIGHT,
+    MAX_WEIGHT,
+    MIN_WEIGHT,
+    PICK_PLAYER_COMMAND,
+    SHOW_LEADERBOARD_COMMAND,
+    SHOW_PERSONAL_STATS_COMMAND,
+    TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS,
+    UPDATE_PLAYER_WEIGHT_COMMAND,
+    USER_MEMBER_STATUS,
+    WEIGHT_FLOW_MAX_SIZE,
+    WEIGHT_FLOW_TTL,
+)
+from database import (
+    dispose,
+    engine,
+)
+from metrics import (
+    StatementStats,
+    current_statement_stats,
+)
+from models import (
+    Player,
+    PlayerDrawCount,
+)
+from services import MemoryWeightFlowStore
+
+class Budget(NamedTuple):
+    statements: int
+    connections: int
+
+# Maximum SQL statements and pooled connections per update, as measured on PostgreSQL 16.
+# Counts must not grow with the number of players, draws or departures: a handler issuing
+# one query per row fails here.
+BUDGETS = {
+    "chatter": Budget(statements=1, connections=1),
+    "chatter_cached": Budget(statements=0, connections=0),
+    "first_draw": Budget(statements=9, connections=1),
+    "cached_draw": Budget(statements=0, connections=0),
+    "repeat_draw": Budget(statements=4, connections=1),
+    "leaderboard": Budget(statements=2, connections=1),
+    "leaderboard_with_departures": Budget(statements=2, connections=1),
+    "personal_stats": Budget(statements=2, connections=1),
+    "show_groups": Budget(statements=1, connections=1),
+    "show_players_in_group": Budget(statements=2, connections=1),
+    "select_player": Budget(statements=1, connections=1),
+    "update_weight": Budget(statements=2, connections=1),
+    "unapproved_chatter": Budget(statements=0, connections=0),
+    "unapproved_command": Budget(statements=0, connections=0),
+    "approve_group": Budget(statements=3, connections=1),
+    "bot_join": Budget(statements=3, connections=2),
+}
+
+class Harness:
+    def __init__(self, application: Application, fake_telegram: FakeTelegram, world: World, approver_id: int) -> None:
+        self.application = application
+        self.fake_telegram = fake_telegram
+        self.world = world
+        self.approver_id = approver_id
+        self.results: Dict[str, List[StatementStats]] = {}
+        self.errors: Dict[str, List[str]] = {}
+        self._errors: List[str] = []
+
+    async def on_error(self, update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+        self._errors.append(repr(context.error))
+
+    async def send(self, scenario: str, data: Dict[str, Any]) -> None:
+        update = Update.de_json(data, self.application.bot)
+        self._errors = []
+        stats = StatementStats()
+        token = current_statement_stats.set(stats)
+        try:
+            await self.application.process_update(update)
+        finally:
+            current_statement_stats.reset(token)
+        self.results.setdefault(scenario, []).append(stats)
+        if self._errors:
+            self.errors.setdefault(scenario, []).extend(self._errors)
+
+    async def leaders(self, group_id: int, limit: int) -> List[int]:
+        async with AsyncSession(engine) as session:
+            result = await session.exec(
+                select(Player.telegram_id)
+                .join(PlayerDrawCount, PlayerDrawCount.player_id == Player.id)
+                .where(
+                    PlayerDrawCount.group_id == group_id,
+                    Player.status.in_(USER_MEMBER_STATUS)
+                )
+                .order_by(PlayerDrawCount.draw_count.desc(), PlayerDrawCount.player_id)
+                .limit(limit)
+            )
+            return list(result.all())
+
+    async def run(self, repetition: int, departures: int) -> None:
+        world = self.world
+        group_id = world.groups[repetition]
+        chat_id = world.group_telegram_ids[group_id]
+        players = world.players[group_id]
+        members = [player for player in players if player.status == "member"]
+        admin = next(player for player in players if player.status == "administrator")
+
+        await self.send("chatter", world.message(chat_id, members[0].telegram_id, "Good morning, court!"))
+        await self.send("chatter_cached", world.message(chat_id, members[0].telegram_id, "Good morning again, court!"))
+
+        await self.send("first_draw", world.message(chat_id, members[1].telegram_id, f"/{PICK_PLAYER_COMMAND}"))
+        await self.send("cached_draw", world.message(chat_id, members[2].telegram_id, f"/{PICK_PLAYER_COMMAND}"))
+        main.jester_cache.invalidate(chat_id)
+        await self.send("repeat_draw", world.message(chat_id, members[2].telegram_id, f"/{PICK_PLAYER_COMMAND}"))
+
+        caller = members[-1]
+        await self.send("leaderboard", world.message(chat_id, caller.telegram_id, f"/{SHOW_LEADERBOARD_COMMAND}"))
+        leaders = await self.leaders(group_id, departures + 1)
+        for telegram_id in [telegram_id for telegram_id in leaders if telegram_id != caller.telegram_id][:departures]:
+            self.fake_telegram.set_status(chat_id, telegram_id, "left")
+        await self.send("leaderboard_with_departures", world.message(chat_id, caller.telegram_id, f"/{SHOW_LEADERBOARD_COMMAND}"))
+        await self.send("personal_stats", world.message(chat_id, caller.telegram_id, f"/{SHOW_PERSONAL_STATS_COMMAND}"))
+
+        weight = MAX_WEIGHT if DEFAULT_WEIGHT != MAX_WEIGHT else MIN_WEIGHT
+        await self.send("show_groups", world.message(admin.telegram_id, admin.telegram_id, f"/{UPDATE_PLAYER_WEIGHT_COMMAND}"))
+        await self.send("show_players_in_group", world.callback_query(admin.telegram_id, f"show_players_in_group:{group_id}"))
+        await self.send("select_player", world.callback_query(admin.telegram_id, f"select_player:{members[1].id}"))
+        await self.send("update_weight", world.callback_query(admin.telegram_id, f"weight:{weight}"))
+
+        if repetition < len(world.pending_group_ids):
+            pending_group_id = world.pending_group_ids[repetition]
+            pending_chat_id = world.group_telegram_ids[pending_group_id]
+            await self.send("unapproved_chatter", world.message(pending_chat_id, members[0].telegram_id, "Good morning, court!"))
+            await self.send("unapproved_command", world.message(pending_chat_id, members[0].telegram_id, f"/{PICK_PLAYER_COMMAND}"))
+            await self.send("approve_group", world.callback_query(self.approver_id, f"approve:{pending_group_id}"))
+        await self.send("bot_join", world.my_chat_member(JOINED_GROUP_TELEGRAM_ID_BASE - repetition - 1, f"Joined group {repetition + 1}", admin.telegram_id, "administrator"))
+
+    def report(self) -> Dict[str, Any]:
+        scenarios = {}
+        for name, budget in BUDGETS.items():
+            results = self.results.get(name, [])
+            statements = max((stats.statements for stats in results), default=None)
+            connections = max((stats.connections for stats in results), default=None)
+            breaches = []
+            if not results:
+                breaches.append("not run")
+            else:
+                if statements > budget.statements:
+                    breaches.append("statements")
+                if connections > budget.connections:
+                    breaches.append("connections")
+            if name in self.errors:
+                breaches.append("errors")
+            scenarios[name] = {
+                "runs": len(results),
+                "statements": statements,
+                "statements_budget": budget.statements,
+                "round_trips": max((stats.round_trips for stats in results), default=None),
+                "connections": connections,
+                "connections_budget": budget.connections,
+                "first_error": self.errors[name][0] if name in self.errors else None,
+                "breached": breaches,
+            }
+        return scenarios
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    approver_id = TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS[0] if TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS else PLAYER_TELEGRAM_ID_BASE + 1
+    await seed(args.repetitions, args.players, args.days, args.admins, args.repetitions, approver_id)
+
+    world = World()
+    await world.load()
+
+    main.weight_flow_store = MemoryWeightFlowStore(WEIGHT_FLOW_TTL, WEIGHT_FLOW_MAX_SIZE)
+    application = await build_application(0)
+    harness = Harness(application, application.bot.request, world, approver_id)
+    async with application:
+        await main.group_registry.load()
+        await main.admin_command_registry.load()
+        application.add_error_handler(harness.on_error)
+        for repetition in range(args.repetitions):
+            await harness.run(repetition, args.departures)
+        await main.player_write_buffer.stop()
+    await dispose()
+
+    scenarios = harness.report()
+    return {
+        "parameters": {
+            "repetitions": args.repetitions,
+            "players": args.players,
+            "days": args.days,
+            "admins": args.admins,
+            "departures": args.departures,
+        },
+        "passed": not any(scenario["breached"] for scenario in scenarios.values()),
+        "scenarios": scenarios,
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check the SQL statements and pooled connections of every handler against a fixed budget per update. Truncates every table of DB_URI (the schema must be migrated).")
+    parser.add_argument("--repetitions", type=int, default=3, help="Number of groups each scenario is run on (the worst run is kept).")
+    parser.add_argument("--players", type=int, default=50, help="Number of players to seed per group.")
+    parser.add_argument("--days", type=int, default=365, help="Number of past days of draws to seed per group.")
+    parser.add_argument("--admins", type=int, default=3, help="Number of administrators among the players of each group.")
+    parser.add_argument("--departures", type=int, default=5, help="Number of leaders who left the group in the departures scenario.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of the standard output.")
+    args = parser.parse_args()
+    if args.admins < 1:
+        parser.error("--admins must be at least 1 for the weight-editing scenarios.")
+    if args.players < args.admins + 4:
+        parser.error("--players must leave at least 4 members besides the administrators.")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = asyncio.run(run(args))
+    report = json.dumps(result, indent=4)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    else:
+        sys.stdout.write(report + "\n")
+    sys.exit(0 if result["passed"] else 1)
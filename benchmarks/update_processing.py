@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import (
+    Dict,
+    List,
+    Tuple,
+)
+
+from telegram import (
+    Chat,
+    Message,
+    Update,
+    User,
+)
+from telegram.ext import (
+    BaseUpdateProcessor,
+    SimpleUpdateProcessor,
+)
+
+from services import KeyedUpdateProcessor
+
+# Bot API calls made by each kind of update, roughly matching the handlers in main.py.
+API_CALLS = {
+    "chatter": 1,
+    "pick_player": 3,
+    "show_leaderboard": 11,
+    "weight_flow": 1,
+}
+
+MIX = {
+    "chatter": 0.8,
+    "pick_player": 0.1,
+    "show_leaderboard": 0.05,
+    "weight_flow": 0.05,
+}
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def make_updates(groups: int, admins: int, count: int, rng: random.Random) -> List[Tuple[str, Update]]:
+    updates = []
+    kinds = list(MIX)
+    weights = [MIX[kind] for kind in kinds]
+    for update_id in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "weight_flow":
+            user_id = rng.randrange(admins) + 1
+            chat = Chat(id=user_id, type=Chat.PRIVATE)
+        else:
+            user_id = rng.randrange(1000) + 1
+            chat = Chat(id=-(rng.randrange(groups) + 1), type=Chat.SUPERGROUP)
+        user = User(id=user_id, first_name=f"User {user_id}", is_bot=False)
+        message = Message(message_id=update_id, date=datetime.now(), chat=chat, from_user=user, text=kind)
+        updates.append((kind, Update(update_id=update_id, message=message)))
+    return updates
+
+async def run(processor: BaseUpdateProcessor, updates: List[Tuple[str, Update]], rate: float, api_latency: float, seed: int) -> Dict[str, object]:
+    rng = random.Random(seed)
+    latencies: Dict[str, List[float]] = {kind: [] for kind in API_CALLS}
+    completed: Dict[int, List[int]] = {}
+
+    async def handle(kind: str, update: Update, received_at: float) -> None:
+        for _ in range(API_CALLS[kind]):
+            await asyncio.sleep(api_latency)
+        latencies[kind].append(time.perf_counter() - received_at)
+        completed.setdefault(update.effective_chat.id, []).append(update.update_id)
+
+    started_at = time.perf_counter()
+    async with processor:
+        tasks = []
+        for kind, update in updates:
+            await asyncio.sleep(rng.expovariate(rate))
+            tasks.append(asyncio.create_task(processor.process_update(update, handle(kind, update, time.perf_counter()))))
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started_at
+
+    all_latencies = [latency for kind_latencies in latencies.values() for latency in kind_latencies]
+    return {
+        "processor": type(processor).__name__,
+        "workers": workers(processor),
+        "updates": len(updates),
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(updates) / elapsed, 1),
+        "p50": round(statistics.median(all_latencies), 4),
+        "p95": round(percentile(all_latencies, 0.95), 4),
+        "p99": round(percentile(all_latencies, 0.99), 4),
+        "p99_by_kind": {
+            kind: round(percentile(kind_latencies, 0.99), 4)
+            for kind, kind_latencies in latencies.items()
+            if kind_latencies
+        },
+        "out_of_order_chats": sum(1 for update_ids in completed.values() if update_ids != sorted(update_ids)),
+    }
+
+def workers(processor: BaseUpdateProcessor) -> int:
+    return processor.max_workers if isinstance(processor, KeyedUpdateProcessor) else processor.max_concurrent_updates
+
+async def run_same_chat_burst(processor: BaseUpdateProcessor, burst: int, handle_seconds: float) -> Dict[str, object]:
+    latencies: Dict[int, float] = {}
+    user = User(id=1, first_name="User 1", is_bot=False)
+
+    async def handle(update: Update, received_at: float) -> None:
+        await asyncio.sleep(handle_seconds if update.effective_chat.id == -1 else 0)
+        latencies[update.update_id] = time.perf_counter() - received_at
+
+    updates = [
+        Update(update_id=update_id, message=Message(message_id=update_id, date=datetime.now(), chat=Chat(id=-1, type=Chat.SUPERGROUP), from_user=user, text="chatter"))
+        for update_id in range(burst)
+    ]
+    other_update = Update(update_id=burst, message=Message(message_id=burst, date=datetime.now(), chat=Chat(id=-2, type=Chat.SUPERGROUP), from_user=user, text="chatter"))
+
+    async with processor:
+        tasks = [
+            asyncio.create_task(processor.process_update(update, handle(update, time.perf_counter())))
+            for update in updates + [other_update]
+        ]
+        await asyncio.gather(*tasks)
+
+    return {
+        "processor": type(processor).__name__,
+        "workers": workers(processor),
+        "busy_chat_updates": burst,
+        "busy_chat_last_latency": round(max(latencies[update.update_id] for update in updates), 4),
+        "other_chat_latency": round(latencies[other_update.update_id], 4),
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare update latency with sequential and per-chat concurrent processing.")
+    parser.add_argument("--groups", type=int, default=50, help="Number of groups sending updates.")
+    parser.add_argument("--admins", type=int, default=10, help="Number of admins using the weight-editing flow.")
+    parser.add_argument("--updates", type=int, default=2000, help="Number of updates to replay.")
+    parser.add_argument("--rate", type=float, default=100, help="Average number of incoming updates per second.")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="Seconds taken by each simulated Bot API call.")
+    parser.add_argument("--workers", type=int, default=32, help="Worker limit of the concurrent processor.")
+    parser.add_argument("--burst-handle-seconds", type=float, default=0.5, help="Seconds taken by each update of the busy chat in the same-chat burst scenario.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    updates = make_updates(args.groups, args.admins, args.updates, random.Random(args.seed))
+    # One chat sends more slow updates than there are workers: another chat must not wait behind them.
+    burst = args.workers + 2
+    results = {
+        "before": await run(SimpleUpdateProcessor(1), updates, args.rate, args.api_latency, args.seed),
+        "after": await run(KeyedUpdateProcessor(args.workers), updates, args.rate, args.api_latency, args.seed),
+        "same_chat_burst": {
+            "before": await run_same_chat_burst(SimpleUpdateProcessor(1), burst, args.burst_handle_seconds),
+            "after": await run_same_chat_burst(KeyedUpdateProcessor(args.workers), burst, args.burst_handle_seconds),
+        },
+    }
+    print(json.dumps(results, indent=4))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,9 @@
 import os
+from datetime import datetime
+from zoneinfo import (
+    ZoneInfo,
+    ZoneInfoNotFoundError,
+)
 
 PRIVATE_CHAT_TYPES = ("private",)
 GROUP_CHAT_TYPES = (
@@ -43,8 +48,88 @@ TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS = tuple(
 if not TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_STATUS and not TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS:
     raise ValueError("TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_STATUS and/or TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS must be defined.")
 
+CONCURRENT_UPDATES = int(os.environ.get("CONCURRENT_UPDATES", 32))
+
+if CONCURRENT_UPDATES < 1:
+    raise ValueError(f"CONCURRENT_UPDATES ({CONCURRENT_UPDATES}) must be greater than or equal to 1.")
+
+TG_BOT_API_MAX_RATE = float(os.environ.get("TG_BOT_API_MAX_RATE", 30))
+
+if TG_BOT_API_MAX_RATE <= 0:
+    raise ValueError(f"TG_BOT_API_MAX_RATE ({TG_BOT_API_MAX_RATE}) must be greater than 0.")
+
+TG_BOT_API_GROUP_MAX_RATE_PER_MINUTE = float(os.environ.get("TG_BOT_API_GROUP_MAX_RATE_PER_MINUTE", 20))
+
+if TG_BOT_API_GROUP_MAX_RATE_PER_MINUTE <= 0:
+    raise ValueError(f"TG_BOT_API_GROUP_MAX_RATE_PER_MINUTE ({TG_BOT_API_GROUP_MAX_RATE_PER_MINUTE}) must be greater than 0.")
+
+TG_BOT_API_PRIVATE_MAX_RATE = float(os.environ.get("TG_BOT_API_PRIVATE_MAX_RATE", 1))
+
+if TG_BOT_API_PRIVATE_MAX_RATE <= 0:
+    raise ValueError(f"TG_BOT_API_PRIVATE_MAX_RATE ({TG_BOT_API_PRIVATE_MAX_RATE}) must be greater than 0.")
+
+TG_BOT_API_MAX_RETRIES = int(os.environ.get("TG_BOT_API_MAX_RETRIES", 3))
+
+if TG_BOT_API_MAX_RETRIES < 0:
+    raise ValueError(f"TG_BOT_API_MAX_RETRIES ({TG_BOT_API_MAX_RETRIES}) must be greater than or equal to 0.")
+
+HTTP_HOST = os.environ.get("HTTP_HOST", "0.0.0.0")
+
+HTTP_PORT = int(os.environ.get("HTTP_PORT", 3000))
+
+if HTTP_PORT < 1 or HTTP_PORT > 65535:
+    raise ValueError(f"HTTP_PORT ({HTTP_PORT}) must be between 1 and 65535.")
+
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL", "").rstrip("/")
+
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "/telegram")
+
+if not WEBHOOK_PATH.startswith("/"):
+    raise ValueError(f"WEBHOOK_PATH ({WEBHOOK_PATH}) must start with /.")
+
+WEBHOOK_SECRET_TOKEN = os.environ.get("WEBHOOK_SECRET_TOKEN", "")
+
+if WEBHOOK_URL and not WEBHOOK_SECRET_TOKEN:
+    raise ValueError("WEBHOOK_SECRET_TOKEN must be defined when WEBHOOK_URL is defined.")
+
 DB_URI = f"postgresql+asyncpg://{os.environ['DB_URI']}"
 
+DB_ECHO = os.environ.get("DB_ECHO", "false").lower() == "true"
+
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+
+if DB_POOL_SIZE < 1:
+    raise ValueError(f"DB_POOL_SIZE ({DB_POOL_SIZE}) must be greater than or equal to 1.")
+
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+
+if DB_MAX_OVERFLOW < 0:
+    raise ValueError(f"DB_MAX_OVERFLOW ({DB_MAX_OVERFLOW}) must be greater than or equal to 0.")
+
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+
+if DB_POOL_TIMEOUT <= 0:
+    raise ValueError(f"DB_POOL_TIMEOUT ({DB_POOL_TIMEOUT}) must be greater than 0.")
+
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+
+if DB_POOL_RECYCLE < -1:
+    raise ValueError(f"DB_POOL_RECYCLE ({DB_POOL_RECYCLE}) must be greater than or equal to -1.")
+
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+
+if DB_STATEMENT_CACHE_SIZE < 0:
+    raise ValueError(f"DB_STATEMENT_CACHE_SIZE ({DB_STATEMENT_CACHE_SIZE}) must be greater than or equal to 0.")
+
+DB_PGBOUNCER = os.environ.get("DB_PGBOUNCER", "false").lower() == "true"
+
+DB_STATEMENT_TIMEOUT = int(os.environ.get("DB_STATEMENT_TIMEOUT", 0))
+
+if DB_STATEMENT_TIMEOUT < 0:
+    raise ValueError(f"DB_STATEMENT_TIMEOUT ({DB_STATEMENT_TIMEOUT}) must be greater than or equal to 0.")
+
 MIN_WEIGHT = int(os.environ.get("MIN_WEIGHT", 1))
 
 if MIN_WEIGHT < 0:
@@ -77,6 +162,93 @@ MIN_PLAYERS = int(os.environ.get("MIN_PLAYERS", 10))
 if MIN_PLAYERS < 2:
     raise ValueError(f"MIN_PLAYERS ({MIN_PLAYERS}) must be greater than or equal to 2.")
 
+LEADERBOARD_SIZE = 10
+
+LEADERBOARD_CANDIDATES_WINDOW = int(os.environ.get("LEADERBOARD_CANDIDATES_WINDOW", 20))
+
+if LEADERBOARD_CANDIDATES_WINDOW < 1:
+    raise ValueError(f"LEADERBOARD_CANDIDATES_WINDOW ({LEADERBOARD_CANDIDATES_WINDOW}) must be greater than or equal to 1.")
+
+GET_CHAT_MEMBER_CONCURRENCY = int(os.environ.get("GET_CHAT_MEMBER_CONCURRENCY", 5))
+
+if GET_CHAT_MEMBER_CONCURRENCY < 1:
+    raise ValueError(f"GET_CHAT_MEMBER_CONCURRENCY ({GET_CHAT_MEMBER_CONCURRENCY}) must be greater than or equal to 1.")
+
+PICK_PLAYER_SELECTION_MODE = os.environ.get("PICK_PLAYER_SELECTION_MODE", "database")
+
+if PICK_PLAYER_SELECTION_MODE not in ("database", "memory"):
+    raise ValueError(f"PICK_PLAYER_SELECTION_MODE ({PICK_PLAYER_SELECTION_MODE}) must be database or memory.")
+
+DAILY_DRAW_TIME = os.environ.get("DAILY_DRAW_TIME")
+DAILY_DRAW_TIMEZONE = None
+
+if DAILY_DRAW_TIME:
+    timezone_name = os.environ.get("DAILY_DRAW_TIMEZONE")
+    if timezone_name:
+        try:
+            DAILY_DRAW_TIMEZONE = ZoneInfo(timezone_name)
+        except (ValueError, ZoneInfoNotFoundError):
+            raise ValueError(f"DAILY_DRAW_TIMEZONE ({timezone_name}) must be an IANA time zone name.")
+    try:
+        DAILY_DRAW_TIME = datetime.strptime(DAILY_DRAW_TIME, "%H:%M").time().replace(tzinfo=DAILY_DRAW_TIMEZONE or datetime.now().astimezone().tzinfo)
+    except ValueError:
+        raise ValueError(f"DAILY_DRAW_TIME ({DAILY_DRAW_TIME}) must be formatted as HH:MM.")
+
+DAILY_DRAW_CANDIDATES = int(os.environ.get("DAILY_DRAW_CANDIDATES", 3))
+
+if DAILY_DRAW_CANDIDATES < 1:
+    raise ValueError(f"DAILY_DRAW_CANDIDATES ({DAILY_DRAW_CANDIDATES}) must be greater than or equal to 1.")
+
+DAILY_DRAW_CONCURRENCY = int(os.environ.get("DAILY_DRAW_CONCURRENCY", 20))
+
+if DAILY_DRAW_CONCURRENCY < 1:
+    raise ValueError(f"DAILY_DRAW_CONCURRENCY ({DAILY_DRAW_CONCURRENCY}) must be greater than or equal to 1.")
+
+WEIGHT_FLOW_STORE = os.environ.get("WEIGHT_FLOW_STORE", "memory")
+
+if WEIGHT_FLOW_STORE not in ("database", "memory"):
+    raise ValueError(f"WEIGHT_FLOW_STORE ({WEIGHT_FLOW_STORE}) must be database or memory.")
+
+WEIGHT_FLOW_TTL = int(os.environ.get("WEIGHT_FLOW_TTL", 900))
+
+if WEIGHT_FLOW_TTL < 1:
+    raise ValueError(f"WEIGHT_FLOW_TTL ({WEIGHT_FLOW_TTL}) must be greater than or equal to 1.")
+
+WEIGHT_FLOW_MAX_SIZE = int(os.environ.get("WEIGHT_FLOW_MAX_SIZE", 1000))
+
+if WEIGHT_FLOW_MAX_SIZE < 1:
+    raise ValueError(f"WEIGHT_FLOW_MAX_SIZE ({WEIGHT_FLOW_MAX_SIZE}) must be greater than or equal to 1.")
+
+PLAYER_WRITE_FLUSH_INTERVAL = int(os.environ.get("PLAYER_WRITE_FLUSH_INTERVAL", 500))
+
+if PLAYER_WRITE_FLUSH_INTERVAL < 1:
+    raise ValueError(f"PLAYER_WRITE_FLUSH_INTERVAL ({PLAYER_WRITE_FLUSH_INTERVAL}) must be greater than or equal to 1.")
+
+PLAYER_WRITE_BATCH_SIZE = int(os.environ.get("PLAYER_WRITE_BATCH_SIZE", 500))
+
+if PLAYER_WRITE_BATCH_SIZE < 1:
+    raise ValueError(f"PLAYER_WRITE_BATCH_SIZE ({PLAYER_WRITE_BATCH_SIZE}) must be greater than or equal to 1.")
+
+MEMBERSHIP_CACHE_TTL = int(os.environ.get("MEMBERSHIP_CACHE_TTL", 300))
+
+if MEMBERSHIP_CACHE_TTL < 0:
+    raise ValueError(f"MEMBERSHIP_CACHE_TTL ({MEMBERSHIP_CACHE_TTL}) must be greater than or equal to 0.")
+
+MEMBERSHIP_CACHE_MAX_SIZE = int(os.environ.get("MEMBERSHIP_CACHE_MAX_SIZE", 10000))
+
+if MEMBERSHIP_CACHE_MAX_SIZE < 1:
+    raise ValueError(f"MEMBERSHIP_CACHE_MAX_SIZE ({MEMBERSHIP_CACHE_MAX_SIZE}) must be greater than or equal to 1.")
+
+CHAT_MEMBER_REUSE_WINDOW = float(os.environ.get("CHAT_MEMBER_REUSE_WINDOW", 2))
+
+if CHAT_MEMBER_REUSE_WINDOW < 0:
+    raise ValueError(f"CHAT_MEMBER_REUSE_WINDOW ({CHAT_MEMBER_REUSE_WINDOW}) must be greater than or equal to 0.")
+
+GROUP_REGISTRY_RECONCILE_INTERVAL = float(os.environ.get("GROUP_REGISTRY_RECONCILE_INTERVAL", 300))
+
+if GROUP_REGISTRY_RECONCILE_INTERVAL <= 0:
+    raise ValueError(f"GROUP_REGISTRY_RECONCILE_INTERVAL ({GROUP_REGISTRY_RECONCILE_INTERVAL}) must be greater than 0.")
+
 NON_APPROVED_GROUP_MESSAGE = os.environ.get("NON_APPROVED_GROUP_MESSAGE", "🏰 Halt! This royal entertainment has not yet been sanctioned! The Court Jester Selector awaits approval from the kingdom's nobles before the foolery can commence.")
 NOT_ENOUGH_PLAYERS_MESSAGE = os.environ.get("NOT_ENOUGH_PLAYERS_MESSAGE", "⚜️ Insufficient subjects detected in the realm! The Court requires a minimum of {min_players} participants before any royal proceedings or records can be accessed. Expand thy circle of jesters!")
 
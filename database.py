@@ -0,0 +1,94 @@
+import asyncio
+import time
+import uuid
+from typing import Dict
+
+from sqlalchemy import (
+    event,
+    text,
+)
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from config import (
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_PGBOUNCER,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_STATEMENT_TIMEOUT,
+    DB_URI,
+)
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+
+    def observe_checkout(self, wait_seconds: float) -> None:
+        self.checkouts += 1
+        self.checkout_wait_seconds_total += wait_seconds
+        self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, wait_seconds)
+
+pool_stats = PoolStats()
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_stats.observe_checkout(time.perf_counter() - started_at)
+
+connect_args = {
+    "prepared_statement_cache_size": 0 if DB_PGBOUNCER else DB_STATEMENT_CACHE_SIZE,
+    "statement_cache_size": 0 if DB_PGBOUNCER else DB_STATEMENT_CACHE_SIZE,
+}
+
+if DB_PGBOUNCER:
+    connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+elif DB_STATEMENT_TIMEOUT:
+    connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT)}
+
+engine = create_async_engine(
+    DB_URI,
+    echo=DB_ECHO,
+    poolclass=InstrumentedPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
+
+if DB_PGBOUNCER and DB_STATEMENT_TIMEOUT:
+    @event.listens_for(engine.sync_engine, "begin")
+    def set_statement_timeout(connection) -> None:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT}")
+
+def pool_status() -> Dict[str, float]:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": pool_stats.checkouts,
+        "checkout_wait_seconds_total": pool_stats.checkout_wait_seconds_total,
+        "checkout_wait_seconds_max": pool_stats.checkout_wait_seconds_max,
+    }
+
+async def warm_up() -> None:
+    connections = await asyncio.gather(*[engine.connect().start() for _ in range(DB_POOL_SIZE)])
+    try:
+        await asyncio.gather(*[connection.execute(text("SELECT 1")) for connection in connections])
+    finally:
+        await asyncio.gather(*[connection.close() for connection in connections])
+
+async def dispose() -> None:
+    await engine.dispose()
\ No newline at end of file
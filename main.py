@@ -1,34 +1,56 @@
 import asyncio
+import functools
 import logging
 import random
-import threading
+import signal
+import time
+from datetime import (
+    date,
+    datetime,
+)
 from typing import (
+    Dict,
+    List,
+    Optional,
     Sequence,
+    Tuple,
     Union
 )
  
-from flask import Flask
 from sqlmodel import (
     and_,
     distinct,
+    exists,
     func,
     or_,
     select,
 )
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import (
+    aliased,
+    selectinload,
+)
 from telegram import (
     Bot,
     BotCommand,
-    BotCommandScopeChat,
     BotCommandScopeAllGroupChats,
+    CallbackQuery,
+    ChatMember,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     Update,
+    User,
 )
 from telegram.ext import (
     Application,
+    ApplicationBuilder,
     CallbackQueryHandler,
     ChatMemberHandler,
     CommandHandler,
@@ -36,6 +58,10 @@ from telegram.ext import (
     MessageHandler,
     filters,
 )
+from telegram.request import (
+    BaseRequest,
+    HTTPXRequest,
+)
 from telegram._chatmember import (
     ChatMemberAdministrator,
     ChatMemberOwner,
@@ -45,24 +71,39 @@ from telegram._chatmember import (
  
 from config import (
     ALLOWED_UPDATES,
-    DB_URI,
+    CHAT_MEMBER_REUSE_WINDOW,
+    CONCURRENT_UPDATES,
+    DAILY_DRAW_CANDIDATES,
+    DAILY_DRAW_CONCURRENCY,
+    DAILY_DRAW_TIME,
+    DAILY_DRAW_TIMEZONE,
+    GET_CHAT_MEMBER_CONCURRENCY,
     GROUP_CHAT_TYPES,
+    GROUP_REGISTRY_RECONCILE_INTERVAL,
     GROUPS_PER_PAGE,
+    HTTP_HOST,
+    HTTP_PORT,
+    LEADERBOARD_CANDIDATES_WINDOW,
     LEADERBOARD_INTRO_MESSAGE,
     LEADERBOARD_NOT_ENOUGH_PICKED_PLAYERS_MESSAGE,
     LEADERBOARD_OUTRO_MESSAGE,
     LEADERBOARD_RANK_MESSAGE,
+    LEADERBOARD_SIZE,
     MAX_WEIGHT,
+    MEMBERSHIP_CACHE_MAX_SIZE,
+    MEMBERSHIP_CACHE_TTL,
     MIN_PLAYERS,
     MIN_WEIGHT,
     NON_APPROVED_GROUP_MESSAGE,
-    NON_MEMBER_USER_STATUS,
     NOT_ENOUGH_PLAYERS_MESSAGE,
     PERSONAL_STATS_MESSAGE,
     PERSONAL_STATS_NO_PICKED_PLAYER_MESSAGE,
     PICK_PLAYER_COMMAND,
     PICK_PLAYER_COMMAND_DESCRIPTION,
     PICK_PLAYER_PICKED_PLAYER_MESSAGE,
+    PICK_PLAYER_SELECTION_MODE,
+    PLAYER_WRITE_BATCH_SIZE,
+    PLAYER_WRITE_FLUSH_INTERVAL,
     PLAYERS_PER_PAGE,
     PRIVATE_CHAT_TYPES,
     SHOW_LEADERBOARD_COMMAND,
@@ -71,15 +112,58 @@ from config import (
     SHOW_PERSONAL_STATS_COMMAND_DESCRIPTION,
     TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_STATUS,
     TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS,
+    TG_BOT_API_GROUP_MAX_RATE_PER_MINUTE,
+    TG_BOT_API_MAX_RATE,
+    TG_BOT_API_MAX_RETRIES,
+    TG_BOT_API_PRIVATE_MAX_RATE,
     TG_BOT_TOKEN,
     UPDATE_PLAYER_WEIGHT_COMMAND,
     UPDATE_PLAYER_WEIGHT_COMMAND_DESCRIPTION,
     USER_MEMBER_STATUS,
+    WEIGHT_FLOW_MAX_SIZE,
+    WEIGHT_FLOW_STORE,
+    WEIGHT_FLOW_TTL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_URL,
+)
+from database import (
+    dispose,
+    engine,
+    warm_up,
+)
+from metrics import (
+    InstrumentedRequest,
+    measure,
+    registry,
+    telegram_retries,
 )
 from models import (
     Draw,
     Group,
     Player,
+    PlayerDrawCount,
+)
+from services import (
+    AdminCommandRegistry,
+    CoalescingBot,
+    DatabaseWeightFlowStore,
+    GroupRegistry,
+    JesterCache,
+    KeyedUpdateProcessor,
+    MembershipCache,
+    MemoryWeightFlowStore,
+    MetricsHandler,
+    PlayerWriteBuffer,
+    PriorityRateLimiter,
+    RegisteredGroup,
+    RequestCoalescer,
+    SingleFlight,
+    UpdateContext,
+    WebServer,
+    WeightFlowState,
+    player_profile,
+    upsert_players,
 )
  
 logging.basicConfig(
@@ -89,35 +173,91 @@ logging.basicConfig(
  
 logger = logging.getLogger(__name__)
  
-engine = create_async_engine(DB_URI, echo=True)
+membership_cache = MembershipCache(ttl=MEMBERSHIP_CACHE_TTL, max_size=MEMBERSHIP_CACHE_MAX_SIZE)
  
-async def set_admin_commands(bot: Bot, chat_members: Sequence[Union[ChatMemberOwner, ChatMemberAdministrator, int]]) -> None:
-    admin_commands = [
-        BotCommand(UPDATE_PLAYER_WEIGHT_COMMAND, UPDATE_PLAYER_WEIGHT_COMMAND_DESCRIPTION)
-    ]
-    set_admin_tasks = []
-    if all(isinstance(chat_member, (ChatMemberOwner, ChatMemberAdministrator)) for chat_member in chat_members):
-        set_admin_tasks = [
-            bot.set_my_commands(
-                commands=admin_commands,
-                scope=BotCommandScopeChat(chat_id=chat_member.user.id)
-            )
-            for chat_member in chat_members
-            if chat_member.status in TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_STATUS
-        ]
-    elif all(isinstance(chat_member, int) for chat_member in chat_members):
-        set_admin_tasks = [
-            bot.set_my_commands(
-                commands=admin_commands,
-                scope=BotCommandScopeChat(chat_id=chat_member)
+draw_single_flight = SingleFlight()
+ 
+jester_cache = JesterCache(DAILY_DRAW_TIMEZONE)
+ 
+web_server = WebServer()
+ 
+rate_limiter = PriorityRateLimiter(
+    overall_max_rate=TG_BOT_API_MAX_RATE,
+    group_max_rate=TG_BOT_API_GROUP_MAX_RATE_PER_MINUTE / 60,
+    private_max_rate=TG_BOT_API_PRIVATE_MAX_RATE,
+    max_retries=TG_BOT_API_MAX_RETRIES,
+    on_retry=telegram_retries.inc
+)
+ 
+request_coalescer = RequestCoalescer(CHAT_MEMBER_REUSE_WINDOW)
+ 
+update_processor = KeyedUpdateProcessor(CONCURRENT_UPDATES)
+ 
+weight_flow_store = (
+    DatabaseWeightFlowStore(engine, WEIGHT_FLOW_TTL)
+    if WEIGHT_FLOW_STORE == "database"
+    else MemoryWeightFlowStore(WEIGHT_FLOW_TTL, WEIGHT_FLOW_MAX_SIZE)
+)
+ 
+context_types = ContextTypes(context=UpdateContext)
+ 
+group_registry = GroupRegistry(engine)
+ 
+player_write_buffer = PlayerWriteBuffer(engine, PLAYER_WRITE_FLUSH_INTERVAL / 1000, PLAYER_WRITE_BATCH_SIZE)
+ 
+registry.gauge("membership_cache_entries", "Chat members held in the membership cache.", lambda: len(membership_cache))
+registry.callback_counter("membership_cache_hits_total", "Membership cache lookups answered from the cache.", lambda: membership_cache.hits)
+registry.callback_counter("membership_cache_misses_total", "Membership cache lookups that missed or expired.", lambda: membership_cache.misses)
+registry.callback_counter("jester_cache_hits_total", "Repeat draw requests answered from today's jester cache.", lambda: jester_cache.hits)
+registry.callback_counter("jester_cache_misses_total", "Draw requests that missed today's jester cache.", lambda: jester_cache.misses)
+registry.gauge("draws_in_flight", "Draws currently being performed.", lambda: len(draw_single_flight))
+registry.callback_counter("chat_member_calls_executed_total", "getChatMember/getChatAdministrators calls sent to the Bot API.", lambda: request_coalescer.executed)
+registry.callback_counter("chat_member_calls_coalesced_total", "getChatMember/getChatAdministrators calls that joined an identical in-flight call.", lambda: request_coalescer.coalesced)
+registry.callback_counter("chat_member_calls_reused_total", "getChatMember/getChatAdministrators calls answered from the reuse window.", lambda: request_coalescer.reused)
+registry.gauge("group_registry_groups", "Groups held in the group registry.", lambda: len(group_registry))
+registry.callback_counter("group_registry_hits_total", "Group lookups answered from the group registry.", lambda: group_registry.hits)
+registry.callback_counter("group_registry_misses_total", "Group lookups of chats unknown to the group registry.", lambda: group_registry.misses)
+registry.callback_counter("group_registry_drifted_total", "Group registry entries corrected by a reconciliation with the database.", lambda: group_registry.drifted)
+registry.gauge("player_writes_pending", "Player profile changes waiting to be written.", lambda: len(player_write_buffer))
+registry.callback_counter("player_writes_pushed_total", "Player profile changes pushed to the write buffer.", lambda: player_write_buffer.pushed)
+registry.callback_counter("player_writes_written_total", "Player rows inserted or updated by the write buffer.", lambda: player_write_buffer.written)
+registry.gauge("updates_in_progress", "Updates currently being handled.", lambda: update_processor.active_updates)
+registry.gauge("telegram_api_queued_requests", "Bot API requests waiting for the rate limiter.", lambda: rate_limiter.queued_requests)
+ 
+admin_command_registry = AdminCommandRegistry(engine, [
+    BotCommand(UPDATE_PLAYER_WEIGHT_COMMAND, UPDATE_PLAYER_WEIGHT_COMMAND_DESCRIPTION),
+])
+ 
+async def set_admin_commands(bot: Bot, chat_members: Sequence[Union[ChatMember, int]]) -> None:
+    granted_user_ids = []
+    demoted_user_ids = []
+    for chat_member in chat_members:
+        if isinstance(chat_member, int):
+            granted_user_ids.append(chat_member)
+        elif chat_member.status in TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_STATUS:
+            granted_user_ids.append(chat_member.user.id)
+        elif chat_member.user.id not in TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS and admin_command_registry.has(chat_member.user.id):
+            demoted_user_ids.append(chat_member.user.id)
+ 
+    if granted_user_ids:
+        await admin_command_registry.grant(bot, granted_user_ids)
+ 
+    if demoted_user_ids:
+        await player_write_buffer.flush()
+        async with AsyncSession(engine) as session:
+            result = await session.exec(
+                select(distinct(Player.telegram_id))
+                .where(
+                    Player.telegram_id.in_(demoted_user_ids),
+                    Player.status.in_(TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_STATUS)
+                )
             )
-            for chat_member in chat_members
-        ]
-    if set_admin_tasks:
-        await asyncio.gather(*set_admin_tasks)
+            still_admin_user_ids = set(result.all())
+        await admin_command_registry.revoke(bot, [user_id for user_id in demoted_user_ids if user_id not in still_admin_user_ids])
     return
  
  
+@measure
 async def bot_chat_member_status_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     chat_member = update.my_chat_member
     status = chat_member.new_chat_member.status
@@ -156,6 +296,9 @@ async def bot_chat_member_status_handler(update: Update, context: ContextTypes.D
             if group:
                 await session.commit()
                 await session.refresh(group)
+                if group.telegram_id != telegram_id:
+                    group_registry.remove(telegram_id)
+                group_registry.set_group(group)
                 logger.info(group.added if added_group else group.updated)
  
             if added_group:
@@ -165,17 +308,8 @@ async def bot_chat_member_status_handler(update: Update, context: ContextTypes.D
                     if TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_STATUS:
                         chat_administrators = await bot.get_chat_administrators(chat_id=group.telegram_id)
                         for chat_administrator in chat_administrators:
-                            user = chat_administrator.user
-                            if user.id not in TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS:
-                                player = Player(
-                                    status=chat_administrator.status,
-                                    group_id=group.id,
-                                    telegram_id=user.id,
-                                    telegram_first_name=user.first_name,
-                                    telegram_last_name=user.last_name,
-                                    telegram_username=user.username
-                                )
-                                players.append(player)
+                            if chat_administrator.user.id not in TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS:
+                                players.append(chat_administrator)
  
                     get_chat_member_tasks = [
                         bot.get_chat_member(chat_id=group.telegram_id, user_id=chat_administrator_user_id)
@@ -186,22 +320,9 @@ async def bot_chat_member_status_handler(update: Update, context: ContextTypes.D
                         chat_members = await asyncio.gather(*get_chat_member_tasks, return_exceptions=True)
                         for chat_member in chat_members:
                             if isinstance(chat_member, (ChatMemberOwner, ChatMemberAdministrator, ChatMemberMember, ChatMemberRestricted)):
-                                user = chat_member.user
-                                player = Player(
-                                    status=chat_member.status,
-                                    group_id=group.id,
-                                    telegram_id=user.id,
-                                    telegram_first_name=user.first_name,
-                                    telegram_last_name=user.last_name,
-                                    telegram_username=user.username
-                                )
-                                players.append(player)
- 
-                    session.add_all(players)
-                    await session.commit()
-                    for player in players:
-                        await session.refresh(player, attribute_names=["group"])
-                        logger.info(player.added)
+                                players.append(chat_member)
+ 
+                    await seed_players(session, group, players)
  
                     if TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_STATUS:
                         if chat_administrators:
@@ -242,128 +363,119 @@ async def bot_chat_member_status_handler(update: Update, context: ContextTypes.D
                         await session.refresh(group)
                         logger.info(f"Approval messages added to {telegram_title} group (id: {group.id}, telegram_id: {telegram_id}).")
                     else:
+                        group_telegram_id = group.telegram_id
                         await session.delete(group)
                         await session.commit()
+                        group_registry.remove(group_telegram_id)
     return
  
+async def seed_players(session: AsyncSession, group: Group, chat_members: Sequence[ChatMember]) -> None:
+    group_id = group.id
+    telegram_id = group.telegram_id
+    telegram_title = group.telegram_title
+    rows = await upsert_players(session, [player_profile(group_id, chat_member.status, chat_member.user) for chat_member in chat_members])
+    await session.commit()
+    for row in rows:
+        player = Player(telegram_first_name=row.telegram_first_name, telegram_last_name=row.telegram_last_name, telegram_username=row.telegram_username)
+        logger.info(f"Player {player.display_name()} (id: {row.id}, telegram_id: {row.telegram_id}) {'added to' if row.inserted else 'updated in'} Group {telegram_title} (id: {group_id}, telegram_id: {telegram_id}) with {row.status} status.")
+ 
+def is_profile_changed(player: Player, status: str, user: User) -> bool:
+    return player.status != status or player.telegram_first_name != user.first_name or player.telegram_last_name != user.last_name or player.telegram_username != user.username
+ 
+def apply_profile(player: Player, status: str, user: User) -> None:
+    player.status = status
+    player.telegram_first_name = user.first_name
+    player.telegram_last_name = user.last_name
+    player.telegram_username = user.username
+ 
+@measure
 async def chat_member_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if update.effective_chat.type in GROUP_CHAT_TYPES:
         message = update.message
         user_id = message.from_user.id
         chat_id = message.chat.id
         bot = context.bot
+        group = group_registry.get_approved(chat_id)
+        if not group:
+            return
+        if membership_cache.is_fresh(chat_id, user_id, message.from_user):
+            return
         async with AsyncSession(engine) as session:
             result = await session.exec(
-                select(Group, Player)
-                .join(Player, and_(
-                    Group.id == Player.group_id,
-                    Player.telegram_id == user_id
-                ), isouter=True)
+                select(Player)
                 .where(
-                    Group.telegram_id == chat_id,
-                    Group.approved == True
+                    Player.group_id == group.id,
+                    Player.telegram_id == user_id
                 )
             )
-            row = result.one_or_none()
-            if row:
-                group, player = row
-                chat_member = await bot.get_chat_member(chat_id, user_id)
-                user = chat_member.user
-                added_player = False
-                updated_player = False
-                if not player:
-                    player = Player(
-                        status=chat_member.status,
-                        group_id=group.id,
-                        telegram_id=user.id,
-                        telegram_first_name=user.first_name,
-                        telegram_last_name=user.last_name,
-                        telegram_username=user.username
-                    )
-                    session.add(player)
-                    added_player = True
-                elif player.status != chat_member.status or player.telegram_first_name != user.first_name or player.telegram_last_name != user.last_name or player.telegram_username != user.username:
-                    player.status = chat_member.status
-                    player.telegram_first_name = user.first_name
-                    player.telegram_last_name = user.last_name
-                    player.telegram_username = user.username
-                    updated_player = True
-                if added_player or updated_player:
-                    await session.commit()
-                    await session.refresh(player, attribute_names=["group"])
-                    logger.info(player.added if added_player else player.updated)
-                await set_admin_commands(bot, [chat_member])
+            player = result.one_or_none()
+        chat_member = await bot.get_chat_member(chat_id, user_id, rate_limit_args={"priority": PriorityRateLimiter.LOW})
+        user = chat_member.user
+        if not player or is_profile_changed(player, chat_member.status, user):
+            player_write_buffer.push(group.id, chat_member.status, user)
+        await set_admin_commands(bot, [chat_member])
+        membership_cache.set(chat_id, user_id, chat_member.status, user)
     return
  
 def protect(func_):
-    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+    @functools.wraps(func_)
+    async def wrapper(update: Update, context: UpdateContext, *args, **kwargs):
         chat_id = update.effective_chat.id
         message = update.message
         user_id = message.from_user.id
         bot = context.bot
+        group = group_registry.get_approved(chat_id)
+        if not group:
+            await message.reply_text(NON_APPROVED_GROUP_MESSAGE)
+            return
         async with AsyncSession(engine) as session:
             result = await session.exec(
-                select(
-                    Group,
-                    func.count(distinct(Player.id)).label("players_count"),
-                    func.count(distinct(Draw.id)).label("draws_count")
-                )
-                .join(Player, Group.id == Player.group_id, isouter=True)
-                .join(Draw, Group.id == Draw.group_id, isouter=True)
+                select(Group.active_players_count, Group.draws_count, Player)
+                .select_from(Group)
+                .join(Player, and_(
+                    Group.id == Player.group_id,
+                    Player.telegram_id == user_id
+                ), isouter=True)
                 .where(
-                    Group.telegram_id == chat_id,
+                    Group.id == group.id,
                     Group.approved == True
                 )
-                .group_by(Group.id)
             )
             row = result.one_or_none()
-            if row:
-                group, players_count, draws_count = row
-                if players_count < MIN_PLAYERS and draws_count == 0:
-                    await message.reply_text(NOT_ENOUGH_PLAYERS_MESSAGE.format(min_players=MIN_PLAYERS))
-                    return
-                else:
-                    result = await session.exec(
-                        select(Player)
-                        .where(
-                            Player.telegram_id == user_id,
-                            Player.group_id == group.id
-                        )
-                    )
-                    player = result.one_or_none()
-                    chat_member = await bot.get_chat_member(chat_id, user_id)
-                    user = chat_member.user
-                    added_player = False
-                    updated_player = False
-                    if not player:
-                        player = Player(
-                            status=chat_member.status,
-                            group_id=group.id,
-                            telegram_id=user.id,
-                            telegram_first_name=user.first_name,
-                            telegram_last_name=user.last_name,
-                            telegram_username=user.username
-                        )
-                        session.add(player)
-                        added_player = True
-                    elif player.status != chat_member.status or player.telegram_first_name != user.first_name or player.telegram_last_name != user.last_name or player.telegram_username != user.username:
-                        player.status = chat_member.status
-                        player.telegram_first_name = user.first_name
-                        player.telegram_last_name = user.last_name
-                        player.telegram_username = user.username
-                        updated_player = True
-                    if added_player or updated_player:
-                        await session.commit()
-                        await session.refresh(player, attribute_names=["group"])
-                        logger.info(player.added if added_player else player.updated)
-                    await set_admin_commands(bot, [chat_member])
- 
-                    return await func_(update, context, *args, **kwargs)
-            else:
+            if not row:
                 await message.reply_text(NON_APPROVED_GROUP_MESSAGE)
                 return
+            active_players_count, draws_count, player = row
+            if active_players_count < MIN_PLAYERS and draws_count == 0:
+                await message.reply_text(NOT_ENOUGH_PLAYERS_MESSAGE.format(min_players=MIN_PLAYERS))
+                return
+            chat_member = await bot.get_chat_member(chat_id, user_id)
+            user = chat_member.user
+            if not player or is_profile_changed(player, chat_member.status, user):
+                player_write_buffer.push(group.id, chat_member.status, user)
+            await set_admin_commands(bot, [chat_member])
+            membership_cache.set(chat_id, user_id, chat_member.status, user)
+ 
+            context.session = session
+            context.group = group
+            context.player = player
+            try:
+                return await func_(update, context, *args, **kwargs)
+            finally:
+                context.session = context.group = context.player = None
     return wrapper
  
+def serve_cached_jester(func_):
+    @functools.wraps(func_)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+        jester = jester_cache.get(update.effective_chat.id)
+        if jester:
+            await update.message.reply_text(PICK_PLAYER_PICKED_PLAYER_MESSAGE.format(username=jester.display_name))
+            return
+        return await func_(update, context, *args, **kwargs)
+    return wrapper
+ 
+@measure
 async def approve_group(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
     await query.answer()
@@ -386,6 +498,7 @@ async def approve_group(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         group_id = group.id
         telegram_id = group.telegram_id
         telegram_title = group.telegram_title
+        status = group.status
         approval_messages = group.approval_messages
  
         approved = (action == "approve")
@@ -424,43 +537,48 @@ async def approve_group(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
  
             for chat_member in chat_members:
                 if isinstance(chat_member, (ChatMemberOwner, ChatMemberAdministrator, ChatMemberMember, ChatMemberRestricted)):
-                    user = chat_member.user
-                    players.append(
-                        Player(
-                            status=chat_member.status,
-                            group_id=group.id,
-                            telegram_id=user.id,
-                            telegram_first_name=user.first_name,
-                            telegram_last_name=user.last_name,
-                            telegram_username=user.username
-                        )
-                    )
+                    players.append(chat_member)
  
         if approved:
             group.approval_messages = None
-            if players:
-                session.add_all(players)
+            await seed_players(session, group, players)
+            group_registry.set(telegram_id, RegisteredGroup(id=group_id, approved=True, status=status, title=telegram_title))
         else:
             await session.delete(group)
- 
-        await session.commit()
+            await session.commit()
+            group_registry.remove(telegram_id)
  
         logger.info(f"Group {telegram_title} (id: {group_id}, telegram_id: {telegram_id}) {'approved' if approved else 'rejected'} by {display_name} (telegram_id: {user.id}).")
  
-        for player in players:
-            await session.refresh(player, attribute_names=["group"])
-            logger.info(player.added)
- 
+async def fetch_page(session: AsyncSession, statement: Select, sort_keys: Sequence[ColumnElement], cursor: Optional[str], cursor_values: Sequence[object], page_size: int) -> Tuple[List, bool, bool]:
+    direction = cursor[0] if cursor else None
+    if direction == ">":
+        statement = statement.where(tuple_(*sort_keys) > tuple_(*cursor_values)).order_by(*sort_keys)
+    elif direction == "<":
+        statement = statement.where(tuple_(*sort_keys) < tuple_(*cursor_values)).order_by(*[sort_key.desc() for sort_key in sort_keys])
+    else:
+        statement = statement.order_by(*sort_keys)
+    result = await session.exec(statement.limit(page_size + 1))
+    rows = result.all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "<":
+        rows.reverse()
+        return rows, has_more, True
+    return rows, direction == ">", has_more
+ 
+@measure
 async def show_groups(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if update.effective_chat.type in PRIVATE_CHAT_TYPES:
         message = update.message
  
         query = update.callback_query
-        page = int(query.data.split(":")[1]) if query else 0
-        offset = page * GROUPS_PER_PAGE
+        cursor = query.data.split(":")[1] if query else None
+        cursor_group_id = int(cursor[1:]) if cursor else None
  
         async with AsyncSession(engine) as session:
-            result = await session.exec(
+            groups, has_previous, has_next = await fetch_page(
+                session,
                 select(Group)
                 .join(Player, Group.id == Player.group_id)
                 .where(
@@ -473,12 +591,15 @@ async def show_groups(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
                             Player.telegram_id.in_(TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS)
                         )
                     )
-                )
-                .order_by(Group.telegram_title.asc())
-                .offset(offset)
-                .limit(GROUPS_PER_PAGE)
+                ),
+                [Group.telegram_title, Group.id],
+                cursor,
+                [
+                    select(Group.telegram_title).where(Group.id == cursor_group_id).correlate(None).scalar_subquery(),
+                    cursor_group_id
+                ],
+                GROUPS_PER_PAGE
             )
-            groups = result.all()
  
             if not groups:
                 await message.reply_text("❌ This bot is not installed or approved on any group.")
@@ -489,21 +610,11 @@ async def show_groups(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             for group in groups:
                 inline_keyboard.append([InlineKeyboardButton(group.telegram_title, callback_data=f"show_players_in_group:{group.id}")])
  
-            total_count_result = await session.exec(
-                select(func.count())
-                .select_from(Group)
-                .where(
-                    Group.status.in_(USER_MEMBER_STATUS),
-                    Group.approved == True
-                )
-            )
-            total_count = total_count_result.one()
- 
             pagination_buttons = []
-            if page > 0:
-                pagination_buttons.append(InlineKeyboardButton("⬅️ Previous", callback_data=f"show_groups_page:{page - 1}"))
-            if total_count > offset + GROUPS_PER_PAGE:
-                pagination_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"show_groups_page:{page + 1}"))
+            if has_previous:
+                pagination_buttons.append(InlineKeyboardButton("⬅️ Previous", callback_data=f"show_groups_page:<{groups[0].id}"))
+            if has_next:
+                pagination_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"show_groups_page:>{groups[-1].id}"))
  
             if pagination_buttons:
                 inline_keyboard.append(pagination_buttons)
@@ -517,46 +628,50 @@ async def show_groups(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
                 await message.reply_text(text=text, reply_markup=reply_markup)
     return
  
+@measure
 async def show_players_in_group(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
     await query.answer()
  
     data = query.data.split(":")
     group_id = int(data[1])
-    page = int(data[2]) if len(data) > 2 else 0
-    offset = page * PLAYERS_PER_PAGE
+    cursor = data[2] if len(data) > 2 else None
  
     async with AsyncSession(engine) as session:
         result = await session.exec(
-            select(Group)
+            select(Group.telegram_title)
             .where(Group.id == group_id)
-            .options(selectinload(Group.players))
         )
-        group = result.one()
-        context.user_data["group"] = group
+        group_title = result.one()
+        await weight_flow_store.set(query.from_user.id, WeightFlowState(group_id=group_id, group_title=group_title))
  
-        if not group.players:
+        players, has_previous, has_next = await fetch_page(
+            session,
+            select(Player)
+            .where(
+                Player.group_id == group_id,
+                Player.status.in_(USER_MEMBER_STATUS)
+            ),
+            [Player.telegram_id],
+            cursor,
+            [int(cursor[1:]) if cursor else None],
+            PLAYERS_PER_PAGE
+        )
+ 
+        if not players:
             await query.edit_message_text("❌ No chat member is a player.")
             return
  
         inline_keyboard = []
  
-        for player in group.players:
+        for player in players:
             inline_keyboard.append([InlineKeyboardButton(f"{player.display_name()}", callback_data=f"select_player:{player.id}")])
  
-        total_count_result = await session.exec(
-            select(func.count())
-            .select_from(Player)
-            .where(Player.group_id == group_id)
-            .where(Player.status.in_(USER_MEMBER_STATUS))
-        )
-        total_count = total_count_result.one()
- 
         pagination_buttons = []
-        if page > 0:
-            pagination_buttons.append(InlineKeyboardButton("⬅️ Previous", callback_data=f"show_players_in_group:{group_id}:{page - 1}"))
-        if total_count > offset + PLAYERS_PER_PAGE:
-            pagination_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"show_players_in_group:{group_id}:{page + 1}"))
+        if has_previous:
+            pagination_buttons.append(InlineKeyboardButton("⬅️ Previous", callback_data=f"show_players_in_group:{group_id}:<{players[0].telegram_id}"))
+        if has_next:
+            pagination_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"show_players_in_group:{group_id}:>{players[-1].telegram_id}"))
  
         if pagination_buttons:
             inline_keyboard.append(pagination_buttons)
@@ -565,26 +680,36 @@ async def show_players_in_group(update: Update, context: ContextTypes.DEFAULT_TY
         await query.edit_message_text(text="👤 Select a player:", reply_markup=reply_markup)
     return
  
+async def get_weight_flow_state(query: CallbackQuery) -> Optional[WeightFlowState]:
+    state = await weight_flow_store.get(query.from_user.id)
+    if not state:
+        await query.edit_message_text(f"⌛ This selection has expired. Send /{UPDATE_PLAYER_WEIGHT_COMMAND} to start again.")
+    return state
+ 
+@measure
 async def ask_player_weight(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
     await query.answer()
  
     player_id = int(query.data.split(":")[1])
  
-    group = context.user_data["group"]
+    state = await get_weight_flow_state(query)
+    if not state:
+        return
  
     async with AsyncSession(engine) as session:
         result = await session.exec(
             select(Player)
             .where(
                 Player.id == player_id,
-                Player.group_id == group.id
+                Player.group_id == state.group_id
             )
-            .options(selectinload(Player.group))
         )
         player = result.one()
  
-        context.user_data["player"] = player
+    state.player_id = player.id
+    state.player_display_name = player.display_name()
+    await weight_flow_store.set(query.from_user.id, state)
  
     inline_keyboard_buttons = [
         InlineKeyboardButton(text=str(weight), callback_data=f"weight:{weight}")
@@ -598,228 +723,427 @@ async def ask_player_weight(update: Update, context: ContextTypes.DEFAULT_TYPE)
  
     reply_markup = InlineKeyboardMarkup(inline_keyboard)
  
-    await query.edit_message_text(text=f"ℹ️ {player.display_name()}'s current weight in the {group.telegram_title} group is {player.weight}.\r\n⚖️ Set a new weight between {MIN_WEIGHT} and {MAX_WEIGHT}:", reply_markup=reply_markup)
+    await query.edit_message_text(text=f"ℹ️ {state.player_display_name}'s current weight in the {state.group_title} group is {player.weight}.\r\n⚖️ Set a new weight between {MIN_WEIGHT} and {MAX_WEIGHT}:", reply_markup=reply_markup)
  
  
+@measure
 async def update_player_weight(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
     await query.answer()
  
     weight = int(query.data.split(":")[1])
  
-    group = context.user_data["group"]
-    player = context.user_data["player"]
+    state = await get_weight_flow_state(query)
+    if not state or state.player_id is None:
+        return
  
     async with AsyncSession(engine) as session:
         result = await session.exec(
             select(Player)
             .where(
-                Player.id == player.id,
-                Player.group_id == group.id
+                Player.id == state.player_id,
+                Player.group_id == state.group_id
             )
-            .options(selectinload(Player.group))
         )
         player = result.one()
         if weight != player.weight:
             player.weight = weight
             await session.commit()
-            await session.refresh(player, attribute_names=["group"])
-            await query.edit_message_text(text=f"✅ {player.display_name()}'s current weight in the {group.telegram_title} group is now {weight}.")
+            await query.edit_message_text(text=f"✅ {state.player_display_name}'s current weight in the {state.group_title} group is now {weight}.")
         else:
-            await query.edit_message_text(text=f"ℹ️ {player.display_name()}'s weight in the {group.telegram_title} group is already {weight}.")
-    
-    context.user_data.clear()
- 
-@protect
-async def pick_player(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    chat_id = update.message.chat_id
-    bot = context.bot
-    async with AsyncSession(engine) as session:
-        result = await session.exec(
-            select(Group)
-            .where(Group.telegram_id == chat_id)
+            await query.edit_message_text(text=f"ℹ️ {state.player_display_name}'s weight in the {state.group_title} group is already {weight}.")
+ 
+    await weight_flow_store.delete(query.from_user.id)
+ 
+async def draw_player(session: AsyncSession, group_id: int, excluded_player_ids: Sequence[int]) -> Optional[Player]:
+    result = await session.exec(
+        select(Player)
+        .where(
+            Player.group_id == group_id,
+            Player.status.in_(USER_MEMBER_STATUS),
+            Player.weight > 0,
+            Player.id.not_in(excluded_player_ids)
         )
-        group = result.one()
+        .order_by(-func.ln(1 - func.random()) / Player.weight)
+        .limit(1)
+    )
+    return result.first()
+ 
+async def record_draw_counts(session: AsyncSession, draws: Sequence[Tuple[int, int, date]]) -> None:
+    statement = insert(PlayerDrawCount).values([
+        {
+            "group_id": group_id,
+            "player_id": player_id,
+            "draw_count": 1,
+            "last_drawn_on": draw_date
+        }
+        for group_id, player_id, draw_date in draws
+    ])
+    await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=[PlayerDrawCount.player_id],
+            set_={
+                "draw_count": PlayerDrawCount.draw_count + 1,
+                "last_drawn_on": func.greatest(PlayerDrawCount.last_drawn_on, statement.excluded.last_drawn_on)
+            }
+        )
+    )
+ 
+async def draw_jester(session: AsyncSession, bot: Bot, group_id: int, group_telegram_id: int, draw_date: date) -> Optional[Tuple[Player, bool]]:
+    rejected_player_ids = []
  
+    if PICK_PLAYER_SELECTION_MODE == "memory":
         result = await session.exec(
-            select(Draw)
+            select(Player)
             .where(
-                Draw.draw_date == func.current_date(),
-                Draw.group_id == group.id
-            )
-            .options(
-                selectinload(Draw.player)
-                .selectinload(Player.group)
+                Player.status.in_(USER_MEMBER_STATUS),
+                Player.group_id == group_id,
+                Player.weight > 0
             )
         )
-        draw = result.one_or_none()
- 
-        added_draw = False
- 
-        if not draw:
-            result = await session.exec(
-                select(Player)
-                .where(
-                    Player.status.in_(USER_MEMBER_STATUS),
-                    Player.group_id == group.id
-                )
-            )
-            players = result.all()
- 
-            while True:
-                picked_player = random.choices(
-                    population=players,
-                    weights=[player.weight for player in players],
-                    k=1
-                )[0]
- 
-                chat_member = await bot.get_chat_member(group.telegram_id, picked_player.telegram_id)
-                status = chat_member.status
-                user = chat_member.user
-                first_name = user.first_name
-                last_name = user.last_name
-                username = user.username
- 
-                if status != picked_player.status or picked_player.telegram_first_name != first_name or picked_player.telegram_last_name != last_name or picked_player.telegram_username != username:
-                    picked_player.status = status
-                    picked_player.telegram_first_name = first_name
-                    picked_player.telegram_last_name = last_name
-                    picked_player.telegram_username = username
-                    await session.commit()
-                    await session.refresh(picked_player, attribute_names=["group"])
-                    logger.info(picked_player.updated)
-                
-                if status in USER_MEMBER_STATUS:
-                    break
+        players = result.all()
  
-                players = [player for player in players if player.id != picked_player.id]
- 
-            draw = Draw(
-                group_id=group.id,
-                player_id=picked_player.id
-            )
-            session.add(draw)
-            await session.commit()
-            await session.refresh(draw, attribute_names=["group", "player"])
-            await session.refresh(draw.player, attribute_names=["group"])
-            logger.info(draw.added)
-            added_draw = True
+    while True:
+        if PICK_PLAYER_SELECTION_MODE == "database":
+            picked_player = await draw_player(session, group_id, rejected_player_ids)
         else:
-            chat_member = await bot.get_chat_member(chat_id, draw.player.telegram_id)
-    
-        text = PICK_PLAYER_PICKED_PLAYER_MESSAGE.format(username=draw.player.display_name(without_at=not added_draw))
-        await update.message.reply_text(text)
+            picked_player = random.choices(
+                population=players,
+                weights=[player.weight for player in players],
+                k=1
+            )[0] if players else None
+ 
+        if not picked_player:
+            return None
+ 
+        chat_member = await bot.get_chat_member(group_telegram_id, picked_player.telegram_id)
+        status = chat_member.status
+        profile_changed = is_profile_changed(picked_player, status, chat_member.user)
+ 
+        if profile_changed:
+            player_write_buffer.push(group_id, status, chat_member.user)
+ 
+        if status in USER_MEMBER_STATUS:
+            break
+ 
+        rejected_player_ids.append(picked_player.id)
+        if PICK_PLAYER_SELECTION_MODE == "memory":
+            players = [player for player in players if player.id != picked_player.id]
+ 
+    result = await session.exec(
+        insert(Draw)
+        .values(
+            draw_date=draw_date,
+            group_id=group_id,
+            player_id=picked_player.id
+        )
+        .on_conflict_do_nothing(constraint="uix_group_date")
+        .returning(Draw.id)
+    )
+    draw_id = result.scalar_one_or_none()
  
-@protect
-async def show_leaderboard(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    chat_id = update.message.chat_id
+    added_draw = draw_id is not None
+ 
+    if added_draw:
+        await record_draw_counts(session, [(group_id, picked_player.id, draw_date)])
  
+    result = await session.exec(
+        select(Draw)
+        .where(
+            Draw.draw_date == draw_date,
+            Draw.group_id == group_id
+        )
+        .options(
+            selectinload(Draw.group),
+            selectinload(Draw.player)
+            .selectinload(Player.group)
+        )
+    )
+    draw = result.one()
+    if added_draw:
+        logger.info(draw.added)
+    else:
+        logger.info(f"Draw {draw.id} (group_id: {group_id}) already added with date {draw_date}.")
+    player = draw.player
+    session.expunge(player)
+    if profile_changed and player.id == picked_player.id:
+        apply_profile(player, status, chat_member.user)
+    await session.commit()
+    return player, added_draw
+ 
+async def verify_candidates(bot: Bot, candidates: Sequence[Row], semaphore: asyncio.Semaphore) -> Optional[Tuple[Row, User]]:
+    async with semaphore:
+        for candidate in candidates:
+            try:
+                chat_member = await bot.get_chat_member(candidate.group_telegram_id, candidate.telegram_id, rate_limit_args={"priority": PriorityRateLimiter.LOW})
+            except Exception as error:
+                logger.warning(f"Chat member {candidate.telegram_id} of Group {candidate.group_id} (telegram_id: {candidate.group_telegram_id}) could not be verified: {error}")
+                continue
+            if is_profile_changed(candidate, chat_member.status, chat_member.user):
+                player_write_buffer.push(candidate.group_id, chat_member.status, chat_member.user)
+            if chat_member.status in USER_MEMBER_STATUS:
+                return candidate, chat_member.user
+    return None
+ 
+async def draw_all_groups(context: ContextTypes.DEFAULT_TYPE) -> None:
+    started_at = time.perf_counter()
+    draw_date = datetime.now(DAILY_DRAW_TIMEZONE).date()
     async with AsyncSession(engine) as session:
-        result = await session.exec(
+        ranked = (
             select(
-                func.rank().over(order_by=func.count(Draw.id).desc()).label("rank"),
-                Player,
-                func.count(Draw.id).label("draw_count")
+                Player.id.label("player_id"),
+                Player.group_id,
+                Player.telegram_id,
+                Player.status,
+                Player.telegram_first_name,
+                Player.telegram_last_name,
+                Player.telegram_username,
+                Group.telegram_id.label("group_telegram_id"),
+                func.row_number().over(
+                    partition_by=Player.group_id,
+                    order_by=-func.ln(1 - func.random()) / Player.weight
+                ).label("position")
             )
-            .join(Group, Player.group_id == Group.id)
-            .join(Draw, Player.id == Draw.player_id)
+            .join(Group, Group.id == Player.group_id)
             .where(
+                Group.approved == True,
+                Group.status.in_(USER_MEMBER_STATUS),
+                or_(Group.active_players_count >= MIN_PLAYERS, Group.draws_count > 0),
                 Player.status.in_(USER_MEMBER_STATUS),
-                Group.telegram_id == chat_id
+                Player.weight > 0,
+                ~exists().where(Draw.group_id == Group.id, Draw.draw_date == draw_date)
             )
-            .group_by(
-                Player
+            .subquery()
+        )
+        result = await session.exec(
+            select(ranked)
+            .where(ranked.c.position <= DAILY_DRAW_CANDIDATES)
+            .order_by(ranked.c.group_id, ranked.c.position)
+        )
+        candidates_by_group: Dict[int, List[Row]] = {}
+        for candidate in result.all():
+            candidates_by_group.setdefault(candidate.group_id, []).append(candidate)
+ 
+    semaphore = asyncio.Semaphore(DAILY_DRAW_CONCURRENCY)
+    picks = [
+        pick
+        for pick in await asyncio.gather(*[
+            verify_candidates(context.bot, candidates, semaphore)
+            for candidates in candidates_by_group.values()
+        ])
+        if pick
+    ]
+ 
+    added_draws = []
+    if picks:
+        async with AsyncSession(engine) as session:
+            result = await session.exec(
+                insert(Draw)
+                .values([
+                    {"draw_date": draw_date, "group_id": candidate.group_id, "player_id": candidate.player_id}
+                    for candidate, _ in picks
+                ])
+                .on_conflict_do_nothing(constraint="uix_group_date")
+                .returning(Draw.id, Draw.group_id, Draw.player_id)
             )
-            .order_by(func.count(Draw.id).desc())
-            .limit(10)
+            added_draws = result.all()
+            if added_draws:
+                await record_draw_counts(session, [(draw.group_id, draw.player_id, draw_date) for draw in added_draws])
+            await session.commit()
+ 
+    added_group_ids = {draw.group_id for draw in added_draws}
+    for candidate, user in picks:
+        if candidate.group_id in added_group_ids:
+            jester_cache.set(candidate.group_telegram_id, draw_date, candidate.player_id, user.username or user.full_name)
+    for draw in added_draws:
+        logger.info(f"Draw {draw.id} (group_id: {draw.group_id}, player_id: {draw.player_id}) added with date {draw_date}.")
+ 
+    elapsed = time.perf_counter() - started_at
+    groups_count = len(candidates_by_group)
+    logger.info(f"Daily draw of {draw_date}: {len(added_draws)} draws added for {groups_count} groups in {elapsed:.2f}s ({groups_count / elapsed if elapsed else 0:.1f} groups/s), {groups_count - len(picks)} groups without a verified candidate.")
+ 
+@measure
+@serve_cached_jester
+@protect
+async def pick_player(update: Update, context: UpdateContext) -> None:
+    chat_id = update.message.chat_id
+    bot = context.bot
+    session = context.session
+    group = context.group
+    draw_date = datetime.now(DAILY_DRAW_TIMEZONE).date()
+ 
+    result = await session.exec(
+        select(Draw)
+        .where(
+            Draw.draw_date == draw_date,
+            Draw.group_id == group.id
         )
-        leaders = result.all()
-        if len(leaders) > 1:
-            text = LEADERBOARD_INTRO_MESSAGE
-            if len(text):
-                text += "\r\n"
+        .options(
+            selectinload(Draw.player)
+            .selectinload(Player.group)
+        )
+    )
+    draw = result.one_or_none()
  
-            get_chat_member_tasks = [context.bot.get_chat_member(chat_id, leader.Player.telegram_id) for leader in leaders]
-            chat_members = await asyncio.gather(*get_chat_member_tasks)
+    if not draw:
+        picked, executed = await draw_single_flight.do(
+            (group.id, draw_date),
+            lambda: draw_jester(session, bot, group.id, chat_id, draw_date)
+        )
+ 
+        if not picked:
+            await update.message.reply_text(NOT_ENOUGH_PLAYERS_MESSAGE.format(min_players=MIN_PLAYERS))
+            return
+ 
+        picked_player, added_draw = picked
+        added_draw = added_draw and executed
+    else:
+        draw_date = draw.draw_date
+        picked_player = draw.player
+        added_draw = False
+ 
+    jester_cache.set(chat_id, draw_date, picked_player.id, picked_player.display_name(without_at=True))
  
-            players = []
+    text = PICK_PLAYER_PICKED_PLAYER_MESSAGE.format(username=picked_player.display_name(without_at=not added_draw))
+    await update.message.reply_text(text)
  
-            for leader, chat_member in zip(leaders, chat_members):
+async def get_chat_members(bot: Bot, chat_id: int, user_ids: Sequence[int]) -> List[Union[ChatMember, Exception]]:
+    semaphore = asyncio.Semaphore(GET_CHAT_MEMBER_CONCURRENCY)
+ 
+    async def get_chat_member(user_id: int) -> ChatMember:
+        async with semaphore:
+            return await bot.get_chat_member(chat_id, user_id)
+ 
+    return await asyncio.gather(*[get_chat_member(user_id) for user_id in user_ids], return_exceptions=True)
+ 
+@measure
+@protect
+async def show_leaderboard(update: Update, context: UpdateContext) -> None:
+    chat_id = update.message.chat_id
+    bot = context.bot
+    session = context.session
+    group = context.group
+ 
+    leaders = []
+    candidates = []
+    last_candidate = None
+    exhausted = False
+ 
+    while len(leaders) < LEADERBOARD_SIZE:
+        if not candidates:
+            if exhausted:
+                break
+            statement = (
+                select(Player, PlayerDrawCount.draw_count)
+                .join(Player, PlayerDrawCount.player_id == Player.id)
+                .where(
+                    Player.status.in_(USER_MEMBER_STATUS),
+                    PlayerDrawCount.group_id == group.id
+                )
+                .order_by(PlayerDrawCount.draw_count.desc(), PlayerDrawCount.player_id)
+                .limit(LEADERBOARD_CANDIDATES_WINDOW)
+            )
+            if last_candidate:
+                statement = statement.where(
+                    or_(
+                        PlayerDrawCount.draw_count < last_candidate.draw_count,
+                        and_(
+                            PlayerDrawCount.draw_count == last_candidate.draw_count,
+                            PlayerDrawCount.player_id > last_candidate.Player.id
+                        )
+                    )
+                )
+            result = await session.exec(statement)
+            candidates = result.all()
+            exhausted = len(candidates) < LEADERBOARD_CANDIDATES_WINDOW
+            if not candidates:
+                break
+            last_candidate = candidates[-1]
+ 
+        batch = candidates[:LEADERBOARD_SIZE - len(leaders)]
+        candidates = candidates[len(batch):]
+ 
+        chat_members = await get_chat_members(bot, chat_id, [candidate.Player.telegram_id for candidate in batch])
+ 
+        for candidate, chat_member in zip(batch, chat_members):
+            player = candidate.Player
+            if isinstance(chat_member, Exception):
+                logger.warning(f"Chat member {player.telegram_id} of Group {group.title} (id: {group.id}, telegram_id: {chat_id}) could not be refreshed: {chat_member}")
+            else:
                 status = chat_member.status
                 user = chat_member.user
-                first_name = user.first_name
-                last_name = user.last_name
-                username = user.username
-                if leader.Player.status != status or leader.Player.telegram_first_name != first_name or leader.Player.telegram_last_name != last_name or leader.Player.telegram_username != username:
-                    leader.Player.status = status
-                    leader.Player.telegram_first_name = first_name
-                    leader.Player.telegram_last_name = last_name
-                    leader.Player.telegram_username = username
-                    players.append(leader.Player)
-                text += LEADERBOARD_RANK_MESSAGE.format(
-                    rank=leader.rank,
-                    username=leader.Player.display_name(without_at=True),
-                    draw_count=leader.draw_count
-                ) + "\r\n"
-            text += LEADERBOARD_OUTRO_MESSAGE
- 
-            if players:
-                session.add_all(players)
-                await session.commit()
-                for player in players:
-                    await session.refresh(player, attribute_names=["group"])
-                    logger.info(player.updated)
-                for player in players:
-                    if player.status in NON_MEMBER_USER_STATUS:
-                        return await show_leaderboard(update, context)
- 
-            await update.message.reply_text(text)
-        else:
-            await update.message.reply_text(LEADERBOARD_NOT_ENOUGH_PICKED_PLAYERS_MESSAGE)
+                if is_profile_changed(player, status, user):
+                    session.expunge(player)
+                    apply_profile(player, status, user)
+                    player_write_buffer.push(player.group_id, status, user)
+                membership_cache.set(chat_id, user.id, status, user)
+            if player.status in USER_MEMBER_STATUS:
+                leaders.append((player, candidate.draw_count))
+ 
+    if len(leaders) > 1:
+        text = LEADERBOARD_INTRO_MESSAGE
+        if len(text):
+            text += "\r\n"
+ 
+        rank = 0
+        for position, (player, draw_count) in enumerate(leaders, 1):
+            if position == 1 or draw_count != leaders[position - 2][1]:
+                rank = position
+            text += LEADERBOARD_RANK_MESSAGE.format(
+                rank=rank,
+                username=player.display_name(without_at=True),
+                draw_count=draw_count
+            ) + "\r\n"
+        text += LEADERBOARD_OUTRO_MESSAGE
+ 
+        await update.message.reply_text(text)
+    else:
+        await update.message.reply_text(LEADERBOARD_NOT_ENOUGH_PICKED_PLAYERS_MESSAGE)
     return
  
+@measure
 @protect
-async def show_personal_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+async def show_personal_stats(update: Update, context: UpdateContext) -> None:
     message = update.message
-    chat_id = message.chat_id
     username = message.from_user.username
-    user_id = message.from_user.id
- 
-    async with AsyncSession(engine) as session:
-        result = await session.exec(
-            select(
-                Player,
-                func.count(Draw.id).label("draw_count")
-            )
-            .join(Group, Player.group_id == Group.id)
-            .join(Draw, Player.id == Draw.player_id)
+    session = context.session
+    player = context.player
+ 
+    stats = None
+    if player and player.status in USER_MEMBER_STATUS:
+        better_player_draw_count = aliased(PlayerDrawCount)
+        better_player = aliased(Player)
+        rank = (
+            select(func.count() + 1)
+            .select_from(better_player_draw_count)
+            .join(better_player, better_player_draw_count.player_id == better_player.id)
             .where(
-                Player.status.in_(USER_MEMBER_STATUS),
-                Group.telegram_id == chat_id
+                better_player_draw_count.group_id == PlayerDrawCount.group_id,
+                better_player_draw_count.draw_count > PlayerDrawCount.draw_count,
+                better_player.status.in_(USER_MEMBER_STATUS)
             )
-            .group_by(
-                Player
+            .scalar_subquery()
+        )
+        result = await session.exec(
+            select(
+                PlayerDrawCount.draw_count,
+                rank.label("rank")
             )
-            .order_by(func.count(Draw.id).desc())
+            .where(PlayerDrawCount.player_id == player.id)
         )
-        ranking = result.all()
-        if ranking:
-            rank_number, rank = next(
-                ((i, rank) for i, rank in enumerate(ranking, 1) if rank.Player.telegram_id == user_id),
-                (None, None)
+        stats = result.one_or_none()
+ 
+    if stats:
+        await message.reply_text(
+            PERSONAL_STATS_MESSAGE
+            .format(
+                username=username,
+                rank=stats.rank,
+                draw_count=stats.draw_count
             )
-            if rank_number and rank:
-                await message.reply_text(
-                    PERSONAL_STATS_MESSAGE
-                    .format(
-                        username=username,
-                        rank=rank_number,
-                        draw_count=rank.draw_count
-                    )
-                )
- 
-        if not ranking or (not rank_number and not rank):
-            await message.reply_text(PERSONAL_STATS_NO_PICKED_PLAYER_MESSAGE.format(username=username))
+        )
+    else:
+        await message.reply_text(PERSONAL_STATS_NO_PICKED_PLAYER_MESSAGE.format(username=username))
     return
  
 def set_handlers(application: Application) -> None:
@@ -828,8 +1152,8 @@ def set_handlers(application: Application) -> None:
         MessageHandler(filters=filters.ChatType.GROUPS & filters.UpdateType.MESSAGE & filters.TEXT & ~filters.COMMAND & ~filters.VIA_BOT, callback=chat_member_handler),
         CallbackQueryHandler(approve_group, pattern=r"^(approve|reject):-?\d+$"),
         CommandHandler(UPDATE_PLAYER_WEIGHT_COMMAND, show_groups),
-        CallbackQueryHandler(show_groups, pattern=r"^show_groups_page:-?\d+$"),
-        CallbackQueryHandler(show_players_in_group, pattern=r"^show_players_in_group:-?\d+$"),
+        CallbackQueryHandler(show_groups, pattern=r"^show_groups_page:[<>]\d+$"),
+        CallbackQueryHandler(show_players_in_group, pattern=r"^show_players_in_group:\d+(:[<>]-?\d+)?$"),
         CallbackQueryHandler(ask_player_weight, pattern=r"^select_player:-?\d+$"),
         CallbackQueryHandler(update_player_weight, pattern=r"^weight:-?\d+$"),
         CommandHandler(PICK_PLAYER_COMMAND, pick_player),
@@ -840,6 +1164,12 @@ def set_handlers(application: Application) -> None:
         application.add_handler(handler)
     return
  
+async def reconcile_group_registry(context: ContextTypes.DEFAULT_TYPE) -> None:
+    drifted = await group_registry.load()
+    if drifted:
+        logger.warning(f"Group registry reconciled: {drifted} groups differed from the database.")
+    return
+ 
 async def set_commands(bot: Bot) -> None:
     await bot.set_my_commands([
         BotCommand(PICK_PLAYER_COMMAND, PICK_PLAYER_COMMAND_DESCRIPTION),
@@ -851,23 +1181,83 @@ async def set_commands(bot: Bot) -> None:
 async def post_init(application: Application) -> None:
     bot = application.bot
     set_handlers(application)
+    await warm_up()
+    player_write_buffer.start()
+    if WEBHOOK_URL:
+        web_server.add_webhook(WEBHOOK_PATH, application, WEBHOOK_SECRET_TOKEN)
+    web_server.add_handler(r"/metrics", MetricsHandler, registry=registry)
+    web_server.start(HTTP_HOST, HTTP_PORT)
+    await group_registry.load()
+    logger.info(f"{len(group_registry)} groups loaded.")
+    application.job_queue.run_repeating(reconcile_group_registry, interval=GROUP_REGISTRY_RECONCILE_INTERVAL, first=GROUP_REGISTRY_RECONCILE_INTERVAL, name="group_registry_reconcile")
+    await admin_command_registry.load()
     await set_admin_commands(bot, TG_BOT_ADMIN_RIGHTS_CHAT_MEMBER_USER_IDS)
     await set_commands(bot)
+    if DAILY_DRAW_TIME:
+        application.job_queue.run_daily(draw_all_groups, time=DAILY_DRAW_TIME, name="daily_draw")
+        logger.info(f"Daily draw scheduled at {DAILY_DRAW_TIME} ({DAILY_DRAW_TIME.tzinfo}).")
     return
  
-def main() -> None:
-    application = Application.builder().token(TG_BOT_TOKEN).post_init(post_init).build()
-    application.run_polling(allowed_updates=ALLOWED_UPDATES)
- 
-app = Flask(__name__)
+async def post_shutdown(application: Application) -> None:
+    await web_server.stop()
+    try:
+        await player_write_buffer.stop()
+    finally:
+        await dispose()
+    return
  
-@app.route('/')
-def index():
-    return 'Bot is running!'
+async def run_webhook(application: Application) -> None:
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(stop_signal, stop_event.set)
+ 
+    try:
+        async with application:
+            try:
+                await application.post_init(application)
+                await application.bot.set_webhook(
+                    url=f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+                    allowed_updates=ALLOWED_UPDATES,
+                    secret_token=WEBHOOK_SECRET_TOKEN
+                )
+                await application.start()
+                logger.info(f"Receiving updates on {WEBHOOK_URL}{WEBHOOK_PATH}.")
+                await stop_event.wait()
+            finally:
+                await web_server.stop()
+                if application.running:
+                    await application.stop()
+    finally:
+        await application.post_shutdown(application)
+ 
+def application_builder(request: BaseRequest, get_updates_request: BaseRequest) -> ApplicationBuilder:
+    return (
+        Application.builder()
+        .bot(CoalescingBot(
+            token=TG_BOT_TOKEN,
+            request=request,
+            get_updates_request=get_updates_request,
+            rate_limiter=rate_limiter,
+            coalescer=request_coalescer
+        ))
+        .concurrent_updates(update_processor)
+        .context_types(context_types)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
  
-def run_web():
-    app.run(host='0.0.0.0', port=3000)
+def main() -> None:
+    builder = application_builder(
+        InstrumentedRequest(connection_pool_size=256),
+        HTTPXRequest(connection_pool_size=1)
+    )
+    if WEBHOOK_URL:
+        application = builder.updater(None).build()
+        asyncio.run(run_webhook(application))
+    else:
+        application = builder.build()
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
  
 if __name__ == "__main__":
-    threading.Thread(target=run_web).start()
     main()
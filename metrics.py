@@ -0,0 +1,119 @@
+import functools
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from telegram.request import HTTPXRequest
+
+from database import (
+    engine,
+    pool_status,
+)
+from services import MetricsRegistry
+
+registry = MetricsRegistry()
+
+handler_duration = registry.histogram("handler_duration_seconds", "Time spent handling an update.", ("handler",))
+handler_errors = registry.counter("handler_errors_total", "Updates whose handler raised an exception.", ("handler",))
+update_sql_statements = registry.histogram("update_sql_statements", "SQL statements executed per update.", ("handler",), buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34))
+update_sql_duration = registry.histogram("update_sql_duration_seconds", "Time spent executing SQL statements per update.", ("handler",))
+update_sql_round_trips = registry.histogram("update_sql_round_trips", "Database round trips (statements, BEGIN, COMMIT and ROLLBACK) per update.", ("handler",), buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34))
+update_db_connections = registry.histogram("update_db_connections", "Database connections checked out per update.", ("handler",), buckets=(0, 1, 2, 3, 4, 5, 8))
+sql_statements = registry.counter("sql_statements_total", "SQL statements executed.")
+sql_duration = registry.histogram("sql_statement_duration_seconds", "Time spent executing a SQL statement.")
+telegram_requests = registry.counter("telegram_api_requests_total", "Bot API requests by method and HTTP status (429 means rate limited).", ("method", "status"))
+telegram_retries = registry.counter("telegram_api_retries_total", "Bot API requests retried after a flood control error.", ("method",))
+telegram_duration = registry.histogram("telegram_api_request_duration_seconds", "Time spent on a Bot API request.", ("method",))
+
+registry.gauge("db_pool_connections_in_use", "Database connections checked out of the pool.", lambda: pool_status()["in_use"])
+registry.gauge("db_pool_connections_idle", "Database connections idle in the pool.", lambda: pool_status()["idle"])
+registry.gauge("db_pool_overflow", "Database connections opened above the pool size.", lambda: pool_status()["overflow"])
+registry.callback_counter("db_pool_checkouts_total", "Database connection checkouts.", lambda: pool_status()["checkouts"])
+registry.callback_counter("db_pool_checkout_wait_seconds_total", "Time spent waiting for a pooled database connection.", lambda: pool_status()["checkout_wait_seconds_total"])
+registry.gauge("db_pool_checkout_wait_seconds_max", "Longest wait for a pooled database connection.", lambda: pool_status()["checkout_wait_seconds_max"])
+
+class StatementStats:
+    __slots__ = ("statements", "seconds", "round_trips", "connections")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+        self.round_trips = 0
+        self.connections = 0
+
+    def add(self, other: "StatementStats") -> None:
+        self.statements += other.statements
+        self.seconds += other.seconds
+        self.round_trips += other.round_trips
+        self.connections += other.connections
+
+current_statement_stats: ContextVar[Optional[StatementStats]] = ContextVar("current_statement_stats", default=None)
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def before_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    connection.info.setdefault("statement_started_at", []).append(time.perf_counter())
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def after_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - connection.info["statement_started_at"].pop()
+    sql_statements.inc()
+    sql_duration.observe(elapsed)
+    stats = current_statement_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+        stats.round_trips += 1
+
+@event.listens_for(engine.sync_engine, "begin")
+@event.listens_for(engine.sync_engine, "commit")
+@event.listens_for(engine.sync_engine, "rollback")
+def transaction_round_trip(connection) -> None:
+    stats = current_statement_stats.get()
+    if stats is not None:
+        stats.round_trips += 1
+
+@event.listens_for(engine.sync_engine, "checkout")
+def checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    stats = current_statement_stats.get()
+    if stats is not None:
+        stats.connections += 1
+
+def measure(func_):
+    name = func_.__name__
+
+    @functools.wraps(func_)
+    async def wrapper(*args, **kwargs):
+        parent_stats = current_statement_stats.get()
+        stats = StatementStats()
+        token = current_statement_stats.set(stats)
+        started_at = time.perf_counter()
+        try:
+            return await func_(*args, **kwargs)
+        except Exception:
+            handler_errors.inc(name)
+            raise
+        finally:
+            handler_duration.observe(time.perf_counter() - started_at, name)
+            update_sql_statements.observe(stats.statements, name)
+            update_sql_duration.observe(stats.seconds, name)
+            update_sql_round_trips.observe(stats.round_trips, name)
+            update_db_connections.observe(stats.connections, name)
+            current_statement_stats.reset(token)
+            if parent_stats is not None:
+                parent_stats.add(stats)
+    return wrapper
+
+class InstrumentedRequest(HTTPXRequest):
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        endpoint = url.rsplit("/", 1)[-1]
+        started_at = time.perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception:
+            telegram_requests.inc(endpoint, "error")
+            raise
+        finally:
+            telegram_duration.observe(time.perf_counter() - started_at, endpoint)
+        telegram_requests.inc(endpoint, str(code))
+        return code, payload
\ No newline at end of file
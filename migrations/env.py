@@ -14,9 +14,12 @@ from sqlmodel import SQLModel
 from config import DB_URI
 
 from models import (
+    AdminCommand,
     Draw,
     Group,
     Player,
+    PlayerDrawCount,
+    WeightFlow,
 )
 
 # this is the Alembic Config object, which provides
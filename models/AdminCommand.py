@@ -0,0 +1,12 @@
+from sqlmodel import (
+    BigInteger,
+    Column,
+    Field,
+    SQLModel,
+)
+
+class AdminCommand(SQLModel, table=True):
+    __tablename__ = "admin_command"
+
+    telegram_id: int = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    commands_hash: str
\ No newline at end of file
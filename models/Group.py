@@ -22,6 +22,9 @@ class Group(SQLModel, table=True):
 
     approved: bool = Field(default=False)
 
+    active_players_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    draws_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
     approval_messages: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON, nullable=True))
 
     players: List["Player"] = Relationship(back_populates="group")
@@ -8,6 +8,7 @@ from sqlmodel import (
     CheckConstraint,
     Column,
     Field,
+    Index,
     Relationship,
     SQLModel,
     UniqueConstraint,
@@ -36,6 +37,7 @@ class Player(SQLModel, table=True):
     __table_args__ = (
         UniqueConstraint("group_id", "telegram_id", name="uix_group_telegram_id"),
         CheckConstraint(f"weight >= {str(MIN_WEIGHT)} AND weight <= {str(MAX_WEIGHT)}", name="ck_weight_bounds"),
+        Index("ix_player_group_id_status", "group_id", "status"),
     )
 
     def display_name(self, without_at=False) -> str:
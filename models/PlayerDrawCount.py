@@ -0,0 +1,20 @@
+from datetime import date
+
+from sqlmodel import (
+    Field,
+    Index,
+    SQLModel,
+    text,
+)
+
+class PlayerDrawCount(SQLModel, table=True):
+    __tablename__ = "player_draw_count"
+
+    player_id: int = Field(foreign_key="player.id", primary_key=True)
+    group_id: int = Field(foreign_key="group.id")
+    draw_count: int = Field(default=0)
+    last_drawn_on: date
+
+    __table_args__ = (
+        Index("ix_player_draw_count_group_id_draw_count", "group_id", text("draw_count DESC"), "player_id"),
+    )
\ No newline at end of file
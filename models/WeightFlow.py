@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import (
+    BigInteger,
+    Column,
+    DateTime,
+    Field,
+    SQLModel,
+)
+
+class WeightFlow(SQLModel, table=True):
+    __tablename__ = "weight_flow"
+
+    telegram_id: int = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    group_id: int
+    group_title: str
+    player_id: Optional[int] = None
+    player_display_name: Optional[str] = None
+    expires_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False, index=True))
@@ -1,3 +1,6 @@
 from .Group import Group
 from .Player import Player
-from .Draw import Draw
\ No newline at end of file
+from .Draw import Draw
+from .AdminCommand import AdminCommand
+from .PlayerDrawCount import PlayerDrawCount
+from .WeightFlow import WeightFlow
\ No newline at end of file
@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import logging
+
+from sqlmodel import (
+    delete,
+    func,
+    select,
+    text,
+)
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import (
+    insert,
+    or_,
+)
+
+from database import (
+    dispose,
+    engine,
+)
+from models import (
+    Draw,
+    PlayerDrawCount,
+)
+
+logging.basicConfig(
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    level=logging.INFO
+)
+
+logger = logging.getLogger(__name__)
+
+async def rebuild_player_draw_counts(check_only: bool) -> int:
+    try:
+        async with AsyncSession(engine) as session:
+            await session.exec(text("LOCK TABLE player_draw_count IN EXCLUSIVE MODE"))
+
+            expected = (
+                select(
+                    Draw.player_id,
+                    Draw.group_id,
+                    func.count(Draw.id).label("draw_count"),
+                    func.max(Draw.draw_date).label("last_drawn_on")
+                )
+                .group_by(Draw.player_id, Draw.group_id)
+                .subquery()
+            )
+            result = await session.exec(
+                select(func.count())
+                .select_from(expected)
+                .join(PlayerDrawCount, expected.c.player_id == PlayerDrawCount.player_id, full=True)
+                .where(
+                    or_(
+                        expected.c.player_id.is_(None),
+                        PlayerDrawCount.player_id.is_(None),
+                        expected.c.group_id.is_distinct_from(PlayerDrawCount.group_id),
+                        expected.c.draw_count.is_distinct_from(PlayerDrawCount.draw_count),
+                        expected.c.last_drawn_on.is_distinct_from(PlayerDrawCount.last_drawn_on)
+                    )
+                )
+            )
+            mismatches = result.one()
+            logger.info(f"{mismatches} inconsistent player draw counts found.")
+
+            if check_only or not mismatches:
+                await session.rollback()
+                return mismatches
+
+            await session.exec(delete(PlayerDrawCount))
+            await session.exec(
+                insert(PlayerDrawCount)
+                .from_select(
+                    ["player_id", "group_id", "draw_count", "last_drawn_on"],
+                    select(
+                        expected.c.player_id,
+                        expected.c.group_id,
+                        expected.c.draw_count,
+                        expected.c.last_drawn_on
+                    )
+                )
+            )
+            await session.commit()
+            logger.info("Player draw counts rebuilt from draws.")
+            return mismatches
+    finally:
+        await dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the player_draw_count rollup against the draw table and rebuild it from scratch.")
+    parser.add_argument("--check", action="store_true", help="only report inconsistencies, exit with status 1 if any is found")
+    args = parser.parse_args()
+    mismatches = asyncio.run(rebuild_player_draw_counts(check_only=args.check))
+    if args.check and mismatches:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
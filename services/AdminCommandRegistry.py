@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Set,
+)
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import (
+    delete,
+    select,
+)
+from sqlmodel.ext.asyncio.session import AsyncSession
+from telegram import (
+    Bot,
+    BotCommand,
+    BotCommandScopeChat,
+)
+
+from models import AdminCommand
+
+logger = logging.getLogger(__name__)
+
+class AdminCommandRegistry:
+    def __init__(self, engine: AsyncEngine, commands: Sequence[BotCommand]) -> None:
+        self.engine = engine
+        self.commands = list(commands)
+        self.commands_hash = hashlib.sha256(
+            json.dumps([[command.command, command.description] for command in self.commands]).encode()
+        ).hexdigest()
+        self._hashes: Dict[int, str] = {}
+        self._pending: Set[int] = set()
+
+    async def load(self) -> None:
+        async with AsyncSession(self.engine) as session:
+            result = await session.exec(select(AdminCommand))
+            self._hashes = {admin_command.telegram_id: admin_command.commands_hash for admin_command in result.all()}
+        logger.info(f"{len(self._hashes)} admin commands loaded.")
+
+    def has(self, user_id: int) -> bool:
+        return user_id in self._hashes
+
+    def is_up_to_date(self, user_id: int) -> bool:
+        return self._hashes.get(user_id) == self.commands_hash
+
+    async def grant(self, bot: Bot, user_ids: Iterable[int]) -> None:
+        user_ids = [
+            user_id
+            for user_id in dict.fromkeys(user_ids)
+            if not self.is_up_to_date(user_id) and user_id not in self._pending
+        ]
+        if not user_ids:
+            return
+        self._pending.update(user_ids)
+        try:
+            results = await asyncio.gather(
+                *[
+                    bot.set_my_commands(commands=self.commands, scope=BotCommandScopeChat(chat_id=user_id))
+                    for user_id in user_ids
+                ],
+                return_exceptions=True
+            )
+            granted_user_ids = self._succeeded(user_ids, results, "set")
+            if granted_user_ids:
+                async with AsyncSession(self.engine) as session:
+                    statement = insert(AdminCommand).values([
+                        {"telegram_id": user_id, "commands_hash": self.commands_hash}
+                        for user_id in granted_user_ids
+                    ])
+                    await session.exec(
+                        statement.on_conflict_do_update(
+                            index_elements=[AdminCommand.telegram_id],
+                            set_={"commands_hash": statement.excluded.commands_hash}
+                        )
+                    )
+                    await session.commit()
+                for user_id in granted_user_ids:
+                    self._hashes[user_id] = self.commands_hash
+                    logger.info(f"Admin commands (hash: {self.commands_hash}) set for telegram_id {user_id}.")
+        finally:
+            self._pending.difference_update(user_ids)
+
+    async def revoke(self, bot: Bot, user_ids: Iterable[int]) -> None:
+        user_ids = [
+            user_id
+            for user_id in dict.fromkeys(user_ids)
+            if self.has(user_id) and user_id not in self._pending
+        ]
+        if not user_ids:
+            return
+        self._pending.update(user_ids)
+        try:
+            results = await asyncio.gather(
+                *[
+                    bot.delete_my_commands(scope=BotCommandScopeChat(chat_id=user_id))
+                    for user_id in user_ids
+                ],
+                return_exceptions=True
+            )
+            revoked_user_ids = self._succeeded(user_ids, results, "deleted")
+            if revoked_user_ids:
+                async with AsyncSession(self.engine) as session:
+                    await session.exec(
+                        delete(AdminCommand)
+                        .where(AdminCommand.telegram_id.in_(revoked_user_ids))
+                    )
+                    await session.commit()
+                for user_id in revoked_user_ids:
+                    self._hashes.pop(user_id, None)
+                    logger.info(f"Admin commands deleted for telegram_id {user_id}.")
+        finally:
+            self._pending.difference_update(user_ids)
+
+    @staticmethod
+    def _succeeded(user_ids: Sequence[int], results: Sequence[object], action: str) -> List[int]:
+        succeeded_user_ids = []
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Admin commands could not be {action} for telegram_id {user_id}: {result}")
+            else:
+                succeeded_user_ids.append(user_id)
+        return succeeded_user_ids
\ No newline at end of file
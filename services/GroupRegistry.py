@@ -0,0 +1,87 @@
+import logging
+from typing import (
+    Dict,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Group
+
+logger = logging.getLogger(__name__)
+
+class RegisteredGroup(NamedTuple):
+    id: int
+    approved: bool
+    status: str
+    title: str
+
+class GroupRegistry:
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.hits = 0
+        self.misses = 0
+        self.drifted = 0
+        self._loaded = False
+        self._groups: Dict[int, RegisteredGroup] = {}
+        self._changed: Optional[Set[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    async def load(self) -> int:
+        self._changed = set()
+        try:
+            async with AsyncSession(self.engine) as session:
+                result = await session.exec(
+                    select(Group.telegram_id, Group.id, Group.approved, Group.status, Group.telegram_title)
+                )
+                groups = {
+                    row.telegram_id: RegisteredGroup(id=row.id, approved=row.approved, status=row.status, title=row.telegram_title)
+                    for row in result.all()
+                }
+            for telegram_id in self._changed:
+                groups.pop(telegram_id, None)
+                if telegram_id in self._groups:
+                    groups[telegram_id] = self._groups[telegram_id]
+        finally:
+            self._changed = None
+        drifted = sum(
+            1
+            for telegram_id in groups.keys() | self._groups.keys()
+            if groups.get(telegram_id) != self._groups.get(telegram_id)
+        )
+        self._groups = groups
+        if self._loaded:
+            self.drifted += drifted
+        self._loaded = True
+        return drifted
+
+    def get(self, telegram_id: int) -> Optional[RegisteredGroup]:
+        group = self._groups.get(telegram_id)
+        if group is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return group
+
+    def get_approved(self, telegram_id: int) -> Optional[RegisteredGroup]:
+        group = self.get(telegram_id)
+        return group if group and group.approved else None
+
+    def set(self, telegram_id: int, group: RegisteredGroup) -> None:
+        self._groups[telegram_id] = group
+        if self._changed is not None:
+            self._changed.add(telegram_id)
+
+    def set_group(self, group: Group) -> None:
+        self.set(group.telegram_id, RegisteredGroup(id=group.id, approved=group.approved, status=group.status, title=group.telegram_title))
+
+    def remove(self, telegram_id: int) -> None:
+        self._groups.pop(telegram_id, None)
+        if self._changed is not None:
+            self._changed.add(telegram_id)
@@ -0,0 +1,48 @@
+from datetime import (
+    date,
+    datetime,
+    tzinfo,
+)
+from typing import (
+    Dict,
+    NamedTuple,
+    Optional,
+)
+
+class CachedJester(NamedTuple):
+    player_id: int
+    display_name: str
+
+class JesterCache:
+    def __init__(self, timezone: Optional[tzinfo] = None) -> None:
+        self.timezone = timezone
+        self.hits = 0
+        self.misses = 0
+        self._draw_date = datetime.now(timezone).date()
+        self._jesters: Dict[int, CachedJester] = {}
+
+    def __len__(self) -> int:
+        return len(self._jesters)
+
+    def _roll_over(self) -> date:
+        today = datetime.now(self.timezone).date()
+        if today != self._draw_date:
+            self._jesters.clear()
+            self._draw_date = today
+        return today
+
+    def get(self, chat_id: int) -> Optional[CachedJester]:
+        self._roll_over()
+        jester = self._jesters.get(chat_id)
+        if jester is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return jester
+
+    def set(self, chat_id: int, draw_date: date, player_id: int, display_name: str) -> None:
+        if draw_date == self._roll_over():
+            self._jesters[chat_id] = CachedJester(player_id=player_id, display_name=display_name)
+
+    def invalidate(self, chat_id: int) -> None:
+        self._jesters.pop(chat_id, None)
\ No newline at end of file
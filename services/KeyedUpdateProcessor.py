@@ -0,0 +1,69 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    Hashable,
+    Optional,
+    Tuple,
+)
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+class KeyedUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, max_workers: int, max_pending_updates: int = 4096) -> None:
+        super().__init__(max(max_pending_updates, max_workers))
+        self._max_workers = max_workers
+        self._workers = asyncio.Semaphore(max_workers)
+        self._active = 0
+        self._locks: Dict[Hashable, Tuple[asyncio.Lock, int]] = {}
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def active_updates(self) -> int:
+        return self._active
+
+    @staticmethod
+    def key(update: object) -> Optional[Hashable]:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self.key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+        lock, waiters = self._locks.get(key) or (asyncio.Lock(), 0)
+        self._locks[key] = (lock, waiters + 1)
+        try:
+            async with lock:
+                await self._run(coroutine)
+        finally:
+            lock, waiters = self._locks[key]
+            if waiters == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, waiters - 1)
+
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        async with self._workers:
+            self._active += 1
+            try:
+                await coroutine
+            finally:
+                self._active -= 1
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -0,0 +1,63 @@
+import time
+from collections import OrderedDict
+from typing import (
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from telegram import User
+
+class CachedChatMember(NamedTuple):
+    status: str
+    first_name: str
+    last_name: Optional[str]
+    username: Optional[str]
+    expires_at: float
+
+class MembershipCache:
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, int], CachedChatMember]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, chat_id: int, user_id: int) -> Optional[CachedChatMember]:
+        key = (chat_id, user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def is_fresh(self, chat_id: int, user_id: int, user: User) -> bool:
+        entry = self.get(chat_id, user_id)
+        return (
+            entry is not None
+            and entry.first_name == user.first_name
+            and entry.last_name == user.last_name
+            and entry.username == user.username
+        )
+
+    def set(self, chat_id: int, user_id: int, status: str, user: User) -> None:
+        key = (chat_id, user_id)
+        self._entries[key] = CachedChatMember(
+            status=status,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            username=user.username,
+            expires_at=time.monotonic() + self.ttl
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
\ No newline at end of file
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sqlalchemy import (
+    literal_column,
+    or_,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from telegram import User
+
+from config import DEFAULT_WEIGHT
+from models import Player
+
+logger = logging.getLogger(__name__)
+
+PROFILE_COLUMNS = (
+    "status",
+    "telegram_first_name",
+    "telegram_last_name",
+    "telegram_username",
+)
+
+def player_profile(group_id: int, status: str, user: User) -> Dict[str, Any]:
+    return {
+        "group_id": group_id,
+        "telegram_id": user.id,
+        "status": status,
+        "telegram_first_name": user.first_name,
+        "telegram_last_name": user.last_name,
+        "telegram_username": user.username,
+        "weight": DEFAULT_WEIGHT,
+    }
+
+async def upsert_players(session: AsyncSession, profiles: Iterable[Dict[str, Any]]) -> Sequence[Row]:
+    profiles = list({(profile["group_id"], profile["telegram_id"]): profile for profile in profiles}.values())
+    if not profiles:
+        return []
+    statement = insert(Player).values(profiles)
+    result = await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=[Player.group_id, Player.telegram_id],
+            set_={column: statement.excluded[column] for column in PROFILE_COLUMNS},
+            where=or_(*[
+                getattr(Player, column).is_distinct_from(statement.excluded[column])
+                for column in PROFILE_COLUMNS
+            ])
+        )
+        .returning(
+            Player.id,
+            Player.group_id,
+            Player.telegram_id,
+            Player.status,
+            Player.telegram_first_name,
+            Player.telegram_last_name,
+            Player.telegram_username,
+            literal_column("xmax = 0").label("inserted")
+        )
+    )
+    return result.all()
+
+class PlayerWriteBuffer:
+    def __init__(self, engine: AsyncEngine, flush_interval: float, max_batch_size: int) -> None:
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.pushed = 0
+        self.written = 0
+        self._pending: Dict[Tuple[int, int], Dict[str, object]] = {}
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, group_id: int, status: str, user: User) -> None:
+        self._pending[(group_id, user.id)] = player_profile(group_id, status, user)
+        self.pushed += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as error:
+                logger.exception(f"Player profiles could not be written: {error}")
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                async with AsyncSession(self.engine) as session:
+                    rows = await upsert_players(session, batch.values())
+                    await session.commit()
+            except Exception:
+                self._pending = {**batch, **self._pending}
+                raise
+            self.written += len(rows)
+            for row in rows:
+                logger.info(f"Player {row.id} (telegram_id: {row.telegram_id}) {'added to' if row.inserted else 'updated in'} Group {row.group_id} with {row.status} status.")
@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def delay(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+class PriorityRateLimiter(BaseRateLimiter[Dict[str, Any]]):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+    DEFAULT_PRIORITIES = {
+        "answerCallbackQuery": HIGH,
+        "editMessageText": HIGH,
+        "sendMessage": HIGH,
+        "deleteMyCommands": LOW,
+        "setMyCommands": LOW,
+    }
+
+    def __init__(
+        self,
+        overall_max_rate: float = 30,
+        group_max_rate: float = 20 / 60,
+        private_max_rate: float = 1,
+        max_retries: int = 3,
+        max_chat_buckets: int = 10000,
+        on_retry: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.overall_max_rate = overall_max_rate
+        self.group_max_rate = group_max_rate
+        self.private_max_rate = private_max_rate
+        self.max_retries = max_retries
+        self.max_chat_buckets = max_chat_buckets
+        self.on_retry = on_retry
+        self._overall_bucket = TokenBucket(overall_max_rate, max(overall_max_rate, 1))
+        self._chat_buckets: "OrderedDict[Union[int, str], TokenBucket]" = OrderedDict()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._paused_until = 0.0
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    @property
+    def queued_requests(self) -> int:
+        return len(self._waiters)
+
+    async def initialize(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def shutdown(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+
+    def _chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = self.group_max_rate if is_group else self.private_max_rate
+            bucket = self._chat_buckets[chat_id] = TokenBucket(rate, max(rate * 60, 1) if is_group else 1)
+            while len(self._chat_buckets) > self.max_chat_buckets:
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    async def _acquire(self, priority: int, chat_id: Optional[Union[int, str]]) -> None:
+        if chat_id is not None:
+            bucket = self._chat_bucket(chat_id)
+            while delay := bucket.delay():
+                await asyncio.sleep(delay)
+            bucket.consume()
+        if self._dispatcher is None:
+            await self.initialize()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._wakeup.set()
+        await future
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._waiters:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            delay = max(self._overall_bucket.delay(), self._paused_until - time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._overall_bucket.consume()
+                future.set_result(None)
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Union[bool, Dict[str, Any], List[Dict[str, Any]]]]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[Dict[str, Any]],
+    ) -> Union[bool, Dict[str, Any], List[Dict[str, Any]]]:
+        priority = (rate_limit_args or {}).get("priority", self.DEFAULT_PRIORITIES.get(endpoint, self.NORMAL))
+        chat_id = None if endpoint.startswith("get") else data.get("chat_id")
+        retries = 0
+        while True:
+            await self._acquire(priority, chat_id)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as error:
+                if retries >= self.max_retries:
+                    raise
+                retries += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + error.retry_after)
+                logger.warning(f"Flood control exceeded on {endpoint}, retry {retries}/{self.max_retries} in {error.retry_after} seconds.")
+                if self.on_retry:
+                    self.on_retry(endpoint)
+                await asyncio.sleep(error.retry_after)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from telegram import ChatMember
+from telegram.ext import ExtBot
+
+from .SingleFlight import SingleFlight
+
+T = TypeVar("T")
+
+class RequestCoalescer:
+    def __init__(self, reuse_window: float, max_size: int = 10000) -> None:
+        self.reuse_window = reuse_window
+        self.max_size = max_size
+        self.executed = 0
+        self.coalesced = 0
+        self.reused = 0
+        self._single_flight = SingleFlight()
+        self._results: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._single_flight)
+
+    async def do(self, method: str, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        key = (method, key)
+        entry = self._results.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self.reused += 1
+                return entry[0]
+            del self._results[key]
+        result, executed = await self._single_flight.do(key, func)
+        if executed:
+            self.executed += 1
+            if self.reuse_window > 0:
+                self._results[key] = (result, time.monotonic() + self.reuse_window)
+                while len(self._results) > self.max_size:
+                    self._results.popitem(last=False)
+        else:
+            self.coalesced += 1
+        return result
+
+class CoalescingBot(ExtBot):
+    __slots__ = ("_coalescer",)
+
+    def __init__(self, *args: Any, coalescer: RequestCoalescer, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._coalescer = coalescer
+
+    @property
+    def coalescer(self) -> RequestCoalescer:
+        return self._coalescer
+
+    async def get_chat_member(self, chat_id: Union[str, int], user_id: int, **kwargs: Any) -> ChatMember:
+        return await self.coalescer.do(
+            "getChatMember",
+            (chat_id, user_id),
+            lambda: super(CoalescingBot, self).get_chat_member(chat_id, user_id, **kwargs)
+        )
+
+    async def get_chat_administrators(self, chat_id: Union[str, int], **kwargs: Any) -> Tuple[ChatMember, ...]:
+        return await self.coalescer.do(
+            "getChatAdministrators",
+            chat_id,
+            lambda: super(CoalescingBot, self).get_chat_administrators(chat_id, **kwargs)
+        )
@@ -0,0 +1,33 @@
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        task = self._tasks.get(key)
+        executed = task is None
+        if executed:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done_task: self._forget(key, done_task))
+        return await asyncio.shield(task), executed
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+from telegram.ext import (
+    Application,
+    CallbackContext,
+    ExtBot,
+)
+
+from models import Player
+
+from .GroupRegistry import RegisteredGroup
+
+class UpdateContext(CallbackContext[ExtBot, dict, dict, dict]):
+    __slots__ = ("session", "group", "player")
+
+    def __init__(self, application: Application, chat_id: Optional[int] = None, user_id: Optional[int] = None) -> None:
+        super().__init__(application, chat_id, user_id)
+        self.session: Optional[AsyncSession] = None
+        self.group: Optional[RegisteredGroup] = None
+        self.player: Optional[Player] = None
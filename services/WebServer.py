@@ -0,0 +1,73 @@
+import hmac
+import json
+import logging
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from telegram import Update
+from telegram.ext import Application
+from tornado.httpserver import HTTPServer
+from tornado.web import (
+    Application as TornadoApplication,
+    RequestHandler,
+)
+
+logger = logging.getLogger(__name__)
+
+class HealthHandler(RequestHandler):
+    def get(self) -> None:
+        self.write("Bot is running!")
+
+class WebhookHandler(RequestHandler):
+    def initialize(self, bot_application: Application, secret_token: Optional[str]) -> None:
+        self.bot_application = bot_application
+        self.secret_token = secret_token
+
+    async def post(self) -> None:
+        if self.secret_token and not hmac.compare_digest(
+            self.request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""),
+            self.secret_token
+        ):
+            logger.warning(f"Webhook request from {self.request.remote_ip} rejected: invalid secret token.")
+            self.set_status(403)
+            return
+        if not self.bot_application.running:
+            self.set_status(503)
+            return
+        try:
+            data = json.loads(self.request.body)
+        except ValueError:
+            self.set_status(400)
+            return
+        await self.bot_application.update_queue.put(Update.de_json(data, self.bot_application.bot))
+        self.set_status(200)
+
+class WebServer:
+    def __init__(self) -> None:
+        self._handlers: List[Tuple[str, Type[RequestHandler], Dict[str, Any]]] = [
+            (r"/", HealthHandler, {}),
+        ]
+        self._server: Optional[HTTPServer] = None
+
+    def add_handler(self, pattern: str, handler: Type[RequestHandler], **kwargs: Any) -> None:
+        self._handlers.append((pattern, handler, kwargs))
+
+    def add_webhook(self, path: str, application: Application, secret_token: Optional[str]) -> None:
+        self.add_handler(path, WebhookHandler, bot_application=application, secret_token=secret_token)
+
+    def start(self, host: str, port: int) -> None:
+        self._server = HTTPServer(TornadoApplication(self._handlers), xheaders=True)
+        self._server.listen(port, address=host)
+        logger.info(f"Web server listening on {host}:{port}.")
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.stop()
+            await self._server.close_all_connections()
+            self._server = None
\ No newline at end of file
@@ -0,0 +1,133 @@
+import time
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from collections import OrderedDict
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from typing import (
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import (
+    delete,
+    func,
+    select,
+)
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import WeightFlow
+
+class WeightFlowState:
+    __slots__ = ("group_id", "group_title", "player_id", "player_display_name")
+
+    def __init__(self, group_id: int, group_title: str, player_id: Optional[int] = None, player_display_name: Optional[str] = None) -> None:
+        self.group_id = group_id
+        self.group_title = group_title
+        self.player_id = player_id
+        self.player_display_name = player_display_name
+
+class BaseWeightFlowStore(ABC):
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Optional[WeightFlowState]:
+        ...
+
+    @abstractmethod
+    async def set(self, user_id: int, state: WeightFlowState) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, user_id: int) -> None:
+        ...
+
+class MemoryWeightFlowStore(BaseWeightFlowStore):
+    def __init__(self, ttl: float, max_size: int) -> None:
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._states: "OrderedDict[int, Tuple[WeightFlowState, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def get(self, user_id: int) -> Optional[WeightFlowState]:
+        entry = self._states.get(user_id)
+        if entry is None:
+            return None
+        state, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._states[user_id]
+            return None
+        return state
+
+    async def set(self, user_id: int, state: WeightFlowState) -> None:
+        self._states[user_id] = (state, time.monotonic() + self.ttl)
+        self._states.move_to_end(user_id)
+        while len(self._states) > self.max_size:
+            self._states.popitem(last=False)
+
+    async def delete(self, user_id: int) -> None:
+        self._states.pop(user_id, None)
+
+class DatabaseWeightFlowStore(BaseWeightFlowStore):
+    def __init__(self, engine: AsyncEngine, ttl: float) -> None:
+        super().__init__(ttl)
+        self.engine = engine
+
+    async def get(self, user_id: int) -> Optional[WeightFlowState]:
+        async with AsyncSession(self.engine) as session:
+            result = await session.exec(
+                select(WeightFlow)
+                .where(
+                    WeightFlow.telegram_id == user_id,
+                    WeightFlow.expires_at > func.now()
+                )
+            )
+            weight_flow = result.one_or_none()
+        if weight_flow is None:
+            return None
+        return WeightFlowState(
+            group_id=weight_flow.group_id,
+            group_title=weight_flow.group_title,
+            player_id=weight_flow.player_id,
+            player_display_name=weight_flow.player_display_name
+        )
+
+    async def set(self, user_id: int, state: WeightFlowState) -> None:
+        values = {
+            "group_id": state.group_id,
+            "group_title": state.group_title,
+            "player_id": state.player_id,
+            "player_display_name": state.player_display_name,
+            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+        }
+        async with AsyncSession(self.engine) as session:
+            await session.exec(
+                delete(WeightFlow)
+                .where(WeightFlow.expires_at <= func.now())
+            )
+            statement = insert(WeightFlow).values(telegram_id=user_id, **values)
+            await session.exec(
+                statement.on_conflict_do_update(
+                    index_elements=[WeightFlow.telegram_id],
+                    set_=values
+                )
+            )
+            await session.commit()
+
+    async def delete(self, user_id: int) -> None:
+        async with AsyncSession(self.engine) as session:
+            await session.exec(
+                delete(WeightFlow)
+                .where(WeightFlow.telegram_id == user_id)
+            )
+            await session.commit()
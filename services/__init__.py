@@ -0,0 +1,13 @@
+from .MembershipCache import MembershipCache
+from .AdminCommandRegistry import AdminCommandRegistry
+from .SingleFlight import SingleFlight
+from .JesterCache import JesterCache
+from .WebServer import WebServer
+from .MetricsRegistry import MetricsHandler, MetricsRegistry
+from .RateLimiter import PriorityRateLimiter
+from .RequestCoalescer import CoalescingBot, RequestCoalescer
+from .KeyedUpdateProcessor import KeyedUpdateProcessor
+from .PlayerWriteBuffer import PlayerWriteBuffer, player_profile, upsert_players
+from .WeightFlowStore import DatabaseWeightFlowStore, MemoryWeightFlowStore, WeightFlowState
+from .GroupRegistry import GroupRegistry, RegisteredGroup
+from .UpdateContext import UpdateContext
\ No newline at end of file